@@ -1,21 +1,62 @@
+import os
+import click
 from flask import Flask
-from flasgger import Swagger
-from models.database import db
+from flask.cli import with_appcontext
+from models.database import db, criar_indices, configurar_sqlite, configurar_perfil_sql
+from models.versao_model import criar_versoes
 from controller.route import setup_routes
-import os
-
-app = Flask(__name__)
-app.config["GERENCIAMENTO_BASE_URL"] = os.getenv("GERENCIAMENTO_BASE_URL")
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///atividades_notas.db'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app.secret_key = 'projeto-API'
+from controller.provedor_json import configurar_json
+from controller.compressao import configurar_compressao
+from metricas import configurar_metricas
+from clients import gerenciamento
+from config import Config
 
-swagger = Swagger(app)
-db.init_app(app)
-setup_routes(app)
 
-with app.app_context():
+def criar_schema():
+    """Cria as tabelas, os índices e as linhas de versão que ainda não existem no banco."""
     db.create_all()
+    criar_indices()
+    criar_versoes()
+
+
+@click.command('init-db')
+@with_appcontext
+def init_db():
+    """Cria o schema do banco (flask --app app init-db)."""
+    criar_schema()
+    click.echo('Schema criado.')
+
+
+def create_app(config=Config):
+    app = Flask(__name__)
+    app.config.from_object(config)
+    app.secret_key = 'projeto-API'
+
+    if app.config.get('ENABLE_DOCS'):
+        # Importado só quando a documentação está habilitada: o flasgger
+        # e suas dependências pesam na inicialização de cada worker
+        from flasgger import Swagger
+        Swagger(app)
+    db.init_app(app)
+    configurar_sqlite(app)
+    configurar_perfil_sql(app)
+    configurar_json(app)
+    configurar_compressao(app)
+    configurar_metricas(app, db)
+    gerenciamento.init_app(app)
+    setup_routes(app)
+
+    app.cli.add_command(init_db)
+
+    return app
+
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
+    app = create_app()
+    # O schema é criado uma vez aqui, e não em cada worker
+    with app.app_context():
+        criar_schema()
+    # SERVIDOR=gunicorn sobe o modo de produção (ver gunicorn.conf.py)
+    if os.getenv('SERVIDOR') == 'gunicorn':
+        os.execvp('gunicorn', ['gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app'])
+    app.run(host='0.0.0.0', port=5000, debug=True)
@@ -0,0 +1,85 @@
+"""
+Quantidade de consultas de GET /atividades?expand=notas conforme o número de atividades.
+
+Para cada tamanho, cria um banco SQLite temporário, chama a rota com
+expand=notas (subqueryload) e compara com a serialização ingênua, que
+acessa atividade.notas sem carregamento antecipado (N+1). Com o
+subqueryload, a contagem não depende do número de atividades (o teste
+tests/test_expand.py garante isso).
+
+Uso (a partir da pasta atividades-notas):
+    python benchmarks/bench_expand.py --atividades 10 100 1000 --notas-por-atividade 20
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event
+from app import create_app
+from config import Config
+from models.database import db
+from models.atividades_model import Atividades
+from models.notas_model import Notas
+from controller.route import _atividade_dict
+
+
+def medir(funcao, contador):
+    contador['consultas'] = 0
+    inicio = time.perf_counter()
+    funcao()
+    return {'consultas': contador['consultas'], 'ms': round((time.perf_counter() - inicio) * 1000, 1)}
+
+
+def executar(quantidade, args):
+    caminho = os.path.join(tempfile.mkdtemp(), 'bench_expand.db')
+
+    class ConfigBench(Config):
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///' + caminho
+        ENABLE_DOCS = False
+
+    app = create_app(ConfigBench)
+    contador = {'consultas': 0}
+    with app.app_context():
+        db.create_all()
+        db.session.execute(db.insert(Atividades), [{
+            'nome_atividade': f'Atividade {i}', 'descricao': 'bench', 'peso_porcento': 1.0,
+            'data_entrega': date.today(), 'turma_id': 1, 'professor_id': 1
+        } for i in range(quantidade)])
+        db.session.execute(db.insert(Notas), [{
+            'nota': 5.0, 'aluno_id': j, 'atividade_id': i + 1
+        } for i in range(quantidade) for j in range(args.notas_por_atividade)])
+        db.session.commit()
+
+        @event.listens_for(db.engine, 'before_cursor_execute')
+        def contar(*_):
+            contador['consultas'] += 1
+
+        def ingenuo():
+            [_atividade_dict(a, ('notas',)) for a in Atividades.query.all()]
+            db.session.remove()
+
+        resultado = {'ingenuo': medir(ingenuo, contador)}
+
+    cliente = app.test_client()
+    resultado['expand'] = medir(lambda: cliente.get('/atividades?expand=notas'), contador)
+    os.remove(caminho)
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--atividades', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--notas-por-atividade', type=int, default=20)
+    args = parser.parse_args()
+
+    print(json.dumps({str(n): executar(n, args) for n in args.atividades}, indent=2, ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark das consultas filtradas de notas/atividades com e sem os índices.
+
+Cria um banco SQLite temporário com os modelos do serviço, insere as
+linhas, mede as consultas sem índices secundários, cria os índices com
+criar_indices() e mede de novo.
+
+Uso (a partir da pasta atividades-notas):
+    python benchmarks/bench_indices.py --notas 1000000
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from models.database import db, criar_indices
+from models.atividades_model import Atividades
+from models.notas_model import Notas
+
+
+def medir(consulta, parametros):
+    inicio = time.perf_counter()
+    for valor in parametros:
+        db.session.execute(consulta, {'valor': valor}).all()
+    return (time.perf_counter() - inicio) / len(parametros) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--notas', type=int, default=1_000_000)
+    parser.add_argument('--atividades', type=int, default=5_000)
+    parser.add_argument('--alunos', type=int, default=50_000)
+    parser.add_argument('--turmas', type=int, default=500)
+    parser.add_argument('--consultas', type=int, default=50)
+    args = parser.parse_args()
+
+    caminho = os.path.join(tempfile.mkdtemp(), 'bench_indices.db')
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + caminho
+    db.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        # Remove os índices secundários para medir o cenário antigo
+        for tabela in db.metadata.sorted_tables:
+            for indice in tabela.indexes:
+                indice.drop(bind=db.engine, checkfirst=True)
+
+        aleatorio = random.Random(42)
+        db.session.execute(db.insert(Atividades), [{
+            'nome_atividade': f'Atividade {i}',
+            'descricao': 'bench',
+            'peso_porcento': aleatorio.choice((1.0, 2.0, 3.0)),
+            'data_entrega': date.today(),
+            'turma_id': aleatorio.randint(1, args.turmas),
+            'professor_id': 1
+        } for i in range(args.atividades)])
+        lote = 50_000
+        for inicio in range(0, args.notas, lote):
+            db.session.execute(db.insert(Notas), [{
+                'nota': aleatorio.uniform(0, 10),
+                'aluno_id': aleatorio.randint(1, args.alunos),
+                'atividade_id': aleatorio.randint(1, args.atividades)
+            } for _ in range(min(lote, args.notas - inicio))])
+        db.session.commit()
+
+        consultas = {
+            'notas por aluno_id': (db.text('SELECT * FROM notas WHERE aluno_id = :valor'), args.alunos),
+            'notas por atividade_id': (db.text('SELECT * FROM notas WHERE atividade_id = :valor'), args.atividades),
+            'atividades por turma_id': (db.text('SELECT * FROM atividades WHERE turma_id = :valor'), args.turmas),
+        }
+        parametros = {nome: [aleatorio.randint(1, maximo) for _ in range(args.consultas)]
+                      for nome, (_, maximo) in consultas.items()}
+
+        sem_indice = {nome: medir(sql, parametros[nome]) for nome, (sql, _) in consultas.items()}
+        criar_indices()
+        db.session.execute(db.text('ANALYZE'))
+        com_indice = {nome: medir(sql, parametros[nome]) for nome, (sql, _) in consultas.items()}
+
+    resultado = {
+        nome: {
+            'sem_indice_ms': round(sem_indice[nome], 3),
+            'com_indice_ms': round(com_indice[nome], 3),
+            'ganho': round(sem_indice[nome] / com_indice[nome], 1)
+        } for nome in consultas
+    }
+    print(json.dumps({'notas': args.notas, 'consultas': resultado}, indent=2, ensure_ascii=False))
+    os.remove(caminho)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+Carga mista de leitura/escrita no SQLite com cada perfil de PRAGMAs.
+
+Várias threads fazem, em um banco temporário, consultas de notas por
+aluno e inserções de notas (com commit), e o script mede as operações
+por segundo e as falhas "database is locked" de cada perfil.
+
+Uso (a partir da pasta atividades-notas):
+    python benchmarks/bench_sqlite.py --threads 8 --segundos 10
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from sqlalchemy.exc import OperationalError
+from models.database import db, criar_indices, configurar_sqlite, PERFIS_SQLITE
+from models.atividades_model import Atividades
+from models.notas_model import Notas
+
+
+def executar(perfil, args):
+    caminho = os.path.join(tempfile.mkdtemp(), f'bench_{perfil}.db')
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + caminho
+    app.config['SQLITE_PERFIL'] = perfil
+    db.init_app(app)
+    configurar_sqlite(app)
+
+    with app.app_context():
+        db.create_all()
+        criar_indices()
+        db.session.add(Atividades(nome_atividade='bench', descricao='bench', peso_porcento=1,
+                                  data_entrega=date.today(), turma_id=1, professor_id=1))
+        db.session.commit()
+        db.session.execute(db.insert(Notas), [
+            {'nota': 5.0, 'aluno_id': i % args.alunos, 'atividade_id': 1} for i in range(args.notas)])
+        db.session.commit()
+
+    contagem = {'leituras': 0, 'escritas': 0, 'bloqueios': 0}
+    trava = threading.Lock()
+    fim = time.monotonic() + args.segundos
+
+    def trabalhador(semente):
+        aleatorio = random.Random(semente)
+        local = {'leituras': 0, 'escritas': 0, 'bloqueios': 0}
+        with app.app_context():
+            while time.monotonic() < fim:
+                try:
+                    if aleatorio.random() < args.proporcao_escrita:
+                        db.session.add(Notas(nota=aleatorio.uniform(0, 10),
+                                             aluno_id=aleatorio.randrange(args.alunos), atividade_id=1))
+                        db.session.commit()
+                        local['escritas'] += 1
+                    else:
+                        db.session.execute(db.select(Notas.id, Notas.nota)
+                                           .where(Notas.aluno_id == aleatorio.randrange(args.alunos))).all()
+                        local['leituras'] += 1
+                except OperationalError:
+                    db.session.rollback()
+                    local['bloqueios'] += 1
+            db.session.remove()
+        with trava:
+            for chave, valor in local.items():
+                contagem[chave] += valor
+
+    threads = [threading.Thread(target=trabalhador, args=(i,)) for i in range(args.threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    with app.app_context():
+        db.engine.dispose()
+    return {
+        'ops_por_segundo': round((contagem['leituras'] + contagem['escritas']) / args.segundos, 1),
+        'escritas_por_segundo': round(contagem['escritas'] / args.segundos, 1),
+        'bloqueios': contagem['bloqueios']
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--segundos', type=float, default=10)
+    parser.add_argument('--proporcao-escrita', type=float, default=0.2)
+    parser.add_argument('--notas', type=int, default=100_000)
+    parser.add_argument('--alunos', type=int, default=5_000)
+    args = parser.parse_args()
+
+    print(json.dumps({perfil: executar(perfil, args) for perfil in PERFIS_SQLITE}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
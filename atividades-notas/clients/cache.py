@@ -0,0 +1,64 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class CacheTTL:
+    """
+    Cache LRU de tamanho limitado em que cada item expira após o seu TTL.
+
+    É seguro para uso entre threads e conta acertos, falhas e remoções
+    para expor em /cache/gerenciamento.
+    """
+
+    def __init__(self, tamanho_maximo=10000):
+        self.tamanho_maximo = tamanho_maximo
+        self._itens = OrderedDict()
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+        self.remocoes = 0
+
+    def obter(self, chave):
+        """Retorna o valor de `chave`, ou None se ausente ou expirado."""
+        agora = time.monotonic()
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None or item[1] <= agora:
+                if item is not None:
+                    del self._itens[chave]
+                self.falhas += 1
+                return None
+            self._itens.move_to_end(chave)
+            self.acertos += 1
+            return item[0]
+
+    def definir(self, chave, valor, ttl):
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._itens[chave] = (valor, time.monotonic() + ttl)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.tamanho_maximo:
+                self._itens.popitem(last=False)
+                self.remocoes += 1
+
+    def invalidar(self, chave):
+        with self._lock:
+            self._itens.pop(chave, None)
+
+    def limpar(self):
+        with self._lock:
+            self._itens.clear()
+
+    def estatisticas(self):
+        with self._lock:
+            total = self.acertos + self.falhas
+            return {
+                'itens': len(self._itens),
+                'tamanho_maximo': self.tamanho_maximo,
+                'acertos': self.acertos,
+                'falhas': self.falhas,
+                'remocoes': self.remocoes,
+                'taxa_acerto': round(self.acertos / total, 4) if total else 0.0
+            }
@@ -0,0 +1,365 @@
+import logging
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from sqlalchemy.exc import SQLAlchemyError
+from clients.cache import CacheTTL
+from models import replica_model as replica
+import metricas
+
+logger = logging.getLogger(__name__)
+
+# Resultado das consultas de existência (status HTTP) por (recurso, id).
+# Respostas 404 também são guardadas (cache negativo), com TTL próprio.
+cache = CacheTTL()
+
+# Ids por chamada a POST /<recurso>/exists
+TAMANHO_LOTE_EXISTENCIA = 1000
+# Registros por página na carga inicial da réplica (limite das listagens do Gerenciamento)
+TAMANHO_PAGINA_REPLICA = 1000
+
+_config = {
+    'ttl': 60,
+    'ttl_negativo': 10,
+    'timeout': (2, 5),
+    'replica': False,
+}
+
+
+class CircuitoAberto(requests.exceptions.ConnectionError):
+    """Levantada sem chamar a rede enquanto o disjuntor está aberto."""
+
+
+class Disjuntor:
+    """
+    Disjuntor simples: abre após `limite_falhas` falhas seguidas e, depois
+    de `espera` segundos, deixa passar uma chamada de teste (meio-aberto).
+    """
+
+    def __init__(self, limite_falhas=5, espera=30):
+        self.limite_falhas = limite_falhas
+        self.espera = espera
+        self._falhas = 0
+        self._aberto_ate = 0.0
+        self._lock = threading.Lock()
+
+    def permitir(self):
+        with self._lock:
+            if self._falhas < self.limite_falhas:
+                return True
+            agora = time.monotonic()
+            if agora >= self._aberto_ate:
+                # Meio-aberto: libera uma chamada e segura as demais até o resultado
+                self._aberto_ate = agora + self.espera
+                return True
+            return False
+
+    def sucesso(self):
+        with self._lock:
+            self._falhas = 0
+
+    def falha(self):
+        with self._lock:
+            self._falhas += 1
+            if self._falhas >= self.limite_falhas:
+                self._aberto_ate = time.monotonic() + self.espera
+
+
+def _criar_sessao(tamanho_pool=10, tentativas=2, backoff=0.2):
+    """Session com pool de conexões keep-alive e novas tentativas com backoff."""
+    retry = Retry(
+        total=tentativas,
+        backoff_factor=backoff,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset(['GET', 'POST']),
+        raise_on_status=False
+    )
+    adaptador = HTTPAdapter(pool_connections=1, pool_maxsize=tamanho_pool, max_retries=retry)
+    sessao = requests.Session()
+    sessao.mount('http://', adaptador)
+    sessao.mount('https://', adaptador)
+    return sessao
+
+
+sessao = _criar_sessao()
+disjuntor = Disjuntor()
+# Threads usadas para consultar vários recursos em paralelo
+executor = ThreadPoolExecutor(max_workers=10, thread_name_prefix='gerenciamento')
+
+
+def init_app(app):
+    """Configura o cliente HTTP, o cache e, se habilitados, o feed de mudanças e a réplica local."""
+    global sessao, disjuntor, executor
+    tamanho_pool = app.config.get('GERENCIAMENTO_POOL_TAMANHO', 10)
+    sessao = _criar_sessao(
+        tamanho_pool=tamanho_pool,
+        tentativas=app.config.get('GERENCIAMENTO_TENTATIVAS', 2),
+        backoff=app.config.get('GERENCIAMENTO_BACKOFF', 0.2)
+    )
+    disjuntor = Disjuntor(
+        limite_falhas=app.config.get('GERENCIAMENTO_DISJUNTOR_FALHAS', 5),
+        espera=app.config.get('GERENCIAMENTO_DISJUNTOR_ESPERA', 30)
+    )
+    executor = ThreadPoolExecutor(max_workers=tamanho_pool, thread_name_prefix='gerenciamento')
+    _config['timeout'] = (
+        app.config.get('GERENCIAMENTO_TIMEOUT_CONEXAO', 2),
+        app.config.get('GERENCIAMENTO_TIMEOUT_LEITURA', 5)
+    )
+
+    cache.tamanho_maximo = app.config.get('GERENCIAMENTO_CACHE_TAMANHO', 10000)
+    _config['ttl'] = app.config.get('GERENCIAMENTO_CACHE_TTL', 60)
+    _config['ttl_negativo'] = app.config.get('GERENCIAMENTO_CACHE_TTL_NEGATIVO', 10)
+
+    intervalo = app.config.get('GERENCIAMENTO_FEED_INTERVALO', 0)
+    if intervalo > 0:
+        threading.Thread(
+            target=_acompanhar_mudancas,
+            args=(app.config['GERENCIAMENTO_BASE_URL'], intervalo),
+            name='gerenciamento-feed',
+            daemon=True
+        ).start()
+
+    intervalo_replica = app.config.get('GERENCIAMENTO_REPLICA_INTERVALO', 0)
+    _config['replica'] = intervalo_replica > 0
+    if intervalo_replica > 0:
+        threading.Thread(
+            target=_sincronizar_replica,
+            args=(app, app.config['GERENCIAMENTO_BASE_URL'], intervalo_replica),
+            name='gerenciamento-replica',
+            daemon=True
+        ).start()
+
+
+def requisitar(metodo, url, **kwargs):
+    """
+    Faz a requisição pela sessão compartilhada, com timeout e disjuntor.
+
+    Levanta CircuitoAberto (uma RequestException) sem acessar a rede
+    enquanto o Gerenciamento estiver marcado como indisponível.
+    """
+    if not disjuntor.permitir():
+        raise CircuitoAberto('Gerenciamento indisponível (disjuntor aberto).')
+    kwargs.setdefault('timeout', _config['timeout'])
+    inicio = time.perf_counter()
+    try:
+        resp = sessao.request(metodo, url, **kwargs)
+    except requests.exceptions.RequestException as e:
+        disjuntor.falha()
+        metricas.GERENCIAMENTO.observar((metodo.upper(), type(e).__name__), time.perf_counter() - inicio)
+        raise
+    metricas.GERENCIAMENTO.observar((metodo.upper(), str(resp.status_code)), time.perf_counter() - inicio)
+    if resp.status_code >= 500:
+        disjuntor.falha()
+    else:
+        disjuntor.sucesso()
+    return resp
+
+
+def _na_replica(recurso, id):
+    return _config['replica'] and recurso in replica.MODELOS_REPLICA and replica.existe(recurso, id)
+
+
+def _replica_confiavel(recurso):
+    return _config['replica'] and recurso in replica.MODELOS_REPLICA and replica.completa()
+
+
+def _com_replica(buscar, recurso):
+    """Resultado de `buscar()`; se o Gerenciamento falhar e a réplica de `recurso` estiver completa, 404."""
+    try:
+        return buscar()
+    except requests.exceptions.RequestException:
+        if _replica_confiavel(recurso):
+            return 404
+        raise
+
+
+def consultar(base, recurso, id):
+    """
+    Retorna o status HTTP de GET {base}/{recurso}/{id}, usando a réplica
+    local (se ativa) e o cache.
+
+    Um id presente na réplica dispensa a chamada. Um ausente é confirmado
+    no Gerenciamento, pois a réplica pode estar alguns segundos atrasada;
+    se ele estiver fora do ar, vale a réplica (404). Sem réplica completa,
+    exceções de `requests` são propagadas para que a rota responda 502.
+    """
+    if _na_replica(recurso, id):
+        return 200
+    status = cache.obter((recurso, str(id)))
+    if status is not None:
+        return status
+    return _com_replica(partial(_buscar, base, recurso, id), recurso)
+
+
+def consultar_varios(base, consultas):
+    """
+    Versão de `consultar` para vários pares (recurso, id) ao mesmo tempo.
+
+    As consultas que não estão no cache são feitas em paralelo, e os status
+    voltam na ordem de `consultas`. Se alguma falhar, a exceção é propagada
+    como em chamadas sequenciais.
+    """
+    status = [200 if _na_replica(recurso, id) else cache.obter((recurso, str(id)))
+              for recurso, id in consultas]
+    pendentes = [i for i, s in enumerate(status) if s is None]
+    if not pendentes:
+        return status
+
+    # A primeira consulta pendente roda nesta thread; as demais, no executor
+    futuros = [(i, executor.submit(_buscar, base, *consultas[i])) for i in pendentes[1:]]
+    try:
+        status[pendentes[0]] = _com_replica(partial(_buscar, base, *consultas[pendentes[0]]),
+                                            consultas[pendentes[0]][0])
+    finally:
+        for i, futuro in futuros:
+            status[i] = _com_replica(futuro.result, consultas[i][0])
+    return status
+
+
+def verificar_existencia(base, recurso, ids):
+    """
+    Retorna (encontrados, ausentes) para os `ids` de `recurso`.
+
+    Usa a réplica local (se ativa) e o cache para os ids já conhecidos e
+    resolve o restante com POST {base}/{recurso}/exists, em lotes de
+    TAMANHO_LOTE_EXISTENCIA. Falhas de comunicação levantam uma
+    RequestException, a menos que a réplica esteja completa.
+    """
+    encontrados, ausentes, pendentes = set(), set(), []
+    ids = set(ids)
+    if _config['replica'] and recurso in replica.MODELOS_REPLICA:
+        encontrados = replica.existentes(recurso, ids)
+    for id in ids - encontrados:
+        status = cache.obter((recurso, str(id)))
+        if status == 200:
+            encontrados.add(id)
+        elif status == 404:
+            ausentes.add(id)
+        else:
+            pendentes.append(id)
+
+    try:
+        for i in range(0, len(pendentes), TAMANHO_LOTE_EXISTENCIA):
+            lote = pendentes[i:i + TAMANHO_LOTE_EXISTENCIA]
+            resp = requisitar('POST', f"{base}/{recurso}/exists", json={'ids': lote})
+            resp.raise_for_status()
+            existentes = set(resp.json()['encontrados'])
+            for id in lote:
+                if id in existentes:
+                    encontrados.add(id)
+                    cache.definir((recurso, str(id)), 200, _config['ttl'])
+                else:
+                    ausentes.add(id)
+                    cache.definir((recurso, str(id)), 404, _config['ttl_negativo'])
+    except requests.exceptions.RequestException:
+        if not _replica_confiavel(recurso):
+            raise
+        ausentes.update(id for id in pendentes if id not in encontrados)
+
+    return encontrados, ausentes
+
+
+def _buscar(base, recurso, id):
+    chave = (recurso, str(id))
+    resp = requisitar('GET', f"{base}/{recurso}/{id}")
+    if resp.status_code == 200:
+        cache.definir(chave, 200, _config['ttl'])
+    elif resp.status_code == 404:
+        cache.definir(chave, 404, _config['ttl_negativo'])
+    return resp.status_code
+
+
+def _acompanhar_mudancas(base, intervalo):
+    """Consulta periodicamente GET /mudancas e invalida as entradas alteradas."""
+    cursor = None
+    while True:
+        try:
+            params = {} if cursor is None else {'desde': cursor}
+            resp = requisitar('GET', f"{base}/mudancas", params=params)
+            resp.raise_for_status()
+            dados = resp.json()
+            for mudanca in dados['mudancas']:
+                cache.invalidar((mudanca['recurso'], str(mudanca['id'])))
+            if cursor is None or dados['mudancas']:
+                cursor = dados['cursor']
+        except (requests.exceptions.RequestException, ValueError, KeyError):
+            logger.warning('Falha ao consultar o feed de mudanças do Gerenciamento.')
+        time.sleep(intervalo)
+
+
+def _sincronizar_replica(app, base, intervalo):
+    """
+    Mantém a réplica local de alunos/turmas/professores (models.replica_model).
+
+    Na primeira vez (ou se o feed do Gerenciamento recomeçar), faz a carga
+    completa pelas listagens paginadas; depois, aplica a cada `intervalo`
+    segundos o que mudou em GET /replicacao desde o último cursor. Com vários
+    workers, só o que detém a posse da sincronização atualiza as tabelas.
+    """
+    dono = f'{socket.gethostname()}:{os.getpid()}'
+    while True:
+        with app.app_context():
+            try:
+                if replica.assumir_sincronizacao(dono, validade=3 * intervalo + 30):
+                    _atualizar_replica(base)
+            except (requests.exceptions.RequestException, ValueError, KeyError):
+                replica.db.session.rollback()
+                logger.warning('Falha ao sincronizar a réplica local com o Gerenciamento.')
+            except SQLAlchemyError as e:
+                # Inclusive antes de o schema existir, na primeira execução
+                replica.db.session.rollback()
+                logger.warning('Erro ao gravar a réplica local do Gerenciamento: %s', e)
+        time.sleep(intervalo)
+
+
+def _atualizar_replica(base):
+    estado = replica.estado()
+    if not estado.completa:
+        _carregar_replica(base)
+        return
+    cursor = estado.cursor
+    while True:
+        resp = requisitar('GET', f"{base}/replicacao", params={'desde': cursor})
+        resp.raise_for_status()
+        dados = resp.json()
+        if dados['ultimo'] < cursor:
+            # Feed menor que o cursor: o banco do Gerenciamento foi recriado
+            logger.warning('Feed do Gerenciamento reiniciado; recarregando a réplica local.')
+            _carregar_replica(base)
+            return
+        replica.aplicar(dados['itens'], dados['cursor'])
+        for item in dados['itens']:
+            cache.invalidar((item['recurso'], str(item['id'])))
+        anterior, cursor = cursor, dados['cursor']
+        # Cursor parado: o que resta são mudanças recentes, relidas na próxima rodada
+        if not dados['itens'] or cursor >= dados['ultimo'] or cursor == anterior:
+            return
+
+
+def _carregar_replica(base):
+    """Carga completa da réplica, a partir do cursor atual do feed."""
+    # O cursor é lido antes da carga: o que mudar durante ela é reaplicado depois
+    resp = requisitar('GET', f"{base}/mudancas")
+    resp.raise_for_status()
+    cursor = resp.json()['cursor']
+
+    replica.iniciar_carga()
+    for recurso, model in replica.MODELOS_REPLICA.items():
+        campos = ','.join(model.__table__.c.keys())
+        pagina = 0
+        while pagina is not None:
+            resp = requisitar('GET', f"{base}/{recurso}",
+                              params={'fields': campos, 'limit': TAMANHO_PAGINA_REPLICA, 'cursor': pagina})
+            resp.raise_for_status()
+            dados = resp.json()
+            replica.gravar(recurso, dados['dados'])
+            replica.db.session.commit()
+            pagina = dados['next_cursor']
+    replica.concluir(cursor)
+    logger.info('Réplica local do Gerenciamento carregada (cursor %s).', cursor)
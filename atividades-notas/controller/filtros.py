@@ -0,0 +1,68 @@
+from datetime import datetime
+from flask import request
+
+
+class FiltroInvalido(ValueError):
+    """Parâmetro de filtro da query string em formato inválido."""
+
+
+def filtro_inteiro(nome):
+    valor = request.args.get(nome)
+    if valor is None or valor == '':
+        return None
+    try:
+        return int(valor)
+    except ValueError:
+        raise FiltroInvalido(f'O parâmetro {nome} deve ser um número inteiro.')
+
+
+def filtro_data(nome):
+    valor = request.args.get(nome)
+    if not valor:
+        return None
+    try:
+        return datetime.strptime(valor, '%Y-%m-%d').date()
+    except ValueError:
+        raise FiltroInvalido(f'O parâmetro {nome} deve estar no formato AAAA-MM-DD.')
+
+
+def filtro_booleano(nome):
+    valor = request.args.get(nome)
+    if valor is None or valor == '':
+        return None
+    if valor.lower() in ('1', 'true', 'sim'):
+        return True
+    if valor.lower() in ('0', 'false', 'nao', 'não'):
+        return False
+    raise FiltroInvalido(f'O parâmetro {nome} deve ser true ou false.')
+
+
+def condicoes_igualdade(model, nomes, leitor=filtro_inteiro):
+    """Monta `coluna == valor` para cada parâmetro de `nomes` presente na query string."""
+    condicoes = []
+    for nome in nomes:
+        valor = leitor(nome)
+        if valor is not None:
+            condicoes.append(getattr(model, nome) == valor)
+    return condicoes
+
+
+def condicoes_intervalo(coluna, inicio='de', fim='ate'):
+    """Monta `coluna >= de` e `coluna <= ate` a partir da query string."""
+    condicoes = []
+    de, ate = filtro_data(inicio), filtro_data(fim)
+    if de is not None:
+        condicoes.append(coluna >= de)
+    if ate is not None:
+        condicoes.append(coluna <= ate)
+    return condicoes
+
+
+def expansoes(permitidas, nome='expand'):
+    """Relacionamentos pedidos em `expand` (separados por vírgula), validados contra `permitidas`."""
+    pedidas = {e.strip() for e in request.args.get(nome, '').split(',') if e.strip()}
+    invalidas = sorted(pedidas - set(permitidas))
+    if invalidas:
+        raise FiltroInvalido(f'Valores inválidos em {nome}: {", ".join(invalidas)}. '
+                             f'Use: {", ".join(permitidas)}.')
+    return pedidas
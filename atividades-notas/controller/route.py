@@ -1,16 +1,64 @@
+import csv
+import io
 import requests
 from flask import request, jsonify, current_app
 from models.database import db
-from models.atividades_model import Atividades
-from models.notas_model import Notas
+from models.atividades_model import Atividades, SERIALIZADOR_ATIVIDADE
+from models.notas_model import Notas, SERIALIZADOR_NOTA
+from models import replica_model
+from controller.streaming import quer_ndjson, resposta_ndjson
+from controller.cache_http import cache_http
+from clients import gerenciamento
+from controller.filtros import FiltroInvalido, condicoes_igualdade, condicoes_intervalo, expansoes, filtro_inteiro
+from sqlalchemy.orm import selectinload, subqueryload
 from datetime import datetime
 
+# Relacionamentos aceitos em ?expand= nas rotas de atividades
+EXPANSOES_ATIVIDADE = ('notas',)
+
+# Quantidade máxima de notas aceitas em POST /notas/batch
+LIMITE_LOTE_NOTAS = 50000
+# Ids por cláusula IN, abaixo do limite de parâmetros do SQLite
+TAMANHO_LOTE_IN = 500
+
+
+def _ler_lote_notas():
+    """
+    Lê as notas de POST /notas/batch: lista JSON (ou {"notas": [...]}),
+    corpo text/csv ou arquivo CSV enviado no campo "arquivo".
+    """
+    arquivo = request.files.get('arquivo')
+    if arquivo is not None:
+        return list(csv.DictReader(io.StringIO(arquivo.read().decode('utf-8-sig'))))
+    if request.mimetype == 'text/csv':
+        return list(csv.DictReader(io.StringIO(request.get_data(as_text=True))))
+
+    dados = request.get_json(silent=True)
+    if isinstance(dados, dict):
+        dados = dados.get('notas')
+    if not isinstance(dados, list):
+        return None
+    return dados
+
+
+def _atividade_dict(atv, expandir=()):
+    """
+    Dicionário da atividade; com 'notas' em `expandir`, inclui as notas.
+    A consulta deve carregar Atividades.notas antecipadamente (subqueryload
+    ou selectinload), senão cada atividade dispara uma consulta própria (N+1).
+    """
+    dados = atv.to_dict()
+    if 'notas' in expandir:
+        dados['notas'] = [n.to_dict() for n in atv.notas]
+    return dados
+
 
 def setup_routes(app):
     
     # CRUD ATIVIDADES
 
     @app.route('/atividades', methods=['GET'])
+    @cache_http('atividades', 'notas')
     def listar_atividades():
         """
         Lista todas as atividades
@@ -18,29 +66,71 @@ def setup_routes(app):
         tags:
           - atividades
         summary: Lista todas as atividades cadastradas
+        parameters:
+          - in: query
+            name: stream
+            schema: { type: boolean }
+            required: false
+            description: Transmite a lista em NDJSON (equivale a Accept application/x-ndjson)
+          - in: query
+            name: turma_id
+            schema: { type: integer }
+            required: false
+            description: Retorna apenas as atividades da turma
+          - in: query
+            name: professor_id
+            schema: { type: integer }
+            required: false
+            description: Retorna apenas as atividades do professor
+          - in: query
+            name: de
+            schema: { type: string }
+            required: false
+            description: Data de entrega mínima (AAAA-MM-DD)
+          - in: query
+            name: ate
+            schema: { type: string }
+            required: false
+            description: Data de entrega máxima (AAAA-MM-DD)
+          - in: query
+            name: expand
+            schema: { type: string }
+            required: false
+            description: Inclui as notas de cada atividade (expand=notas); não se aplica ao streaming
         responses:
             200:
                 description: Lista de atividades
             400:
-                description: Nenhuma atividade cadastrada
+                description: Nenhuma atividade cadastrada ou filtro inválido
         """
 
-        atividades = Atividades.query.all()
+        try:
+            condicoes = (condicoes_igualdade(Atividades, ('turma_id', 'professor_id'))
+                         + condicoes_intervalo(Atividades.data_entrega))
+            expandir = expansoes(EXPANSOES_ATIVIDADE)
+        except FiltroInvalido as e:
+            return jsonify({'erro': str(e)}), 400
+
+        if quer_ndjson():
+            return resposta_ndjson(
+                SERIALIZADOR_ATIVIDADE.select().where(*condicoes).order_by(Atividades.id),
+                SERIALIZADOR_ATIVIDADE)
+
+        if 'notas' in expandir:
+            # Uma única consulta extra para todas as notas, qualquer que seja o número de atividades
+            # (o selectinload divide o IN em lotes de 500 e faria uma consulta por lote)
+            atividades = [_atividade_dict(atv, expandir) for atv in
+                          Atividades.query.filter(*condicoes).options(subqueryload(Atividades.notas))]
+        else:
+            atividades = SERIALIZADOR_ATIVIDADE.listar(*condicoes)
 
         if not atividades:
             return jsonify({'mensagem': 'Nenhuma atividade cadastrada!'}), 400
         
-        return jsonify([{
-            'id': atv.id,
-            'nome_atividade': atv.nome_atividade,
-            'descricao': atv.descricao,
-            'peso_porcento': atv.peso_porcento,
-            'data_entrega': atv.data_entrega,
-            'turma_id': atv.turma_id,
-            'professor_id': atv.professor_id
-        } for atv in atividades]), 200
+        return jsonify(atividades), 200
     
     @app.route('/atividades/<int:id>', methods=['GET'])
+    @cache_http('atividades', 'notas')
     def get_atividade(id):
         """
         Obtém uma atividade pelo ID
@@ -55,27 +145,32 @@ def setup_routes(app):
               type: integer
             required: true
             description: ID da atividade
+          - in: query
+            name: expand
+            schema: { type: string }
+            required: false
+            description: Inclui as notas da atividade (expand=notas)
         responses:
           200:
             description: Atividade encontrada
+          400:
+            description: Valor de expand inválido
           404:
             description: Atividade não encontrada
         """
 
-        atv = Atividades.query.get(id)
+        try:
+            expandir = expansoes(EXPANSOES_ATIVIDADE)
+        except FiltroInvalido as e:
+            return jsonify({'erro': str(e)}), 400
+
+        opcoes = [selectinload(Atividades.notas)] if 'notas' in expandir else []
+        atv = db.session.get(Atividades, id, options=opcoes)
 
         if not atv:
             return jsonify({'mensagem': 'Atividade não encontrada!'}) , 404
         
-        return jsonify({
-            'id': atv.id,
-            'nome_atividade': atv.nome_atividade,
-            'descricao': atv.descricao,
-            'peso_porcento': atv.peso_porcento,
-            'data_entrega': atv.data_entrega,
-            'turma_id': atv.turma_id,
-            'professor_id': atv.professor_id
-        }), 200
+        return jsonify(_atividade_dict(atv, expandir)), 200
     
     @app.route('/atividades', methods=['POST'])
     def create_atividade():
@@ -135,20 +230,20 @@ def setup_routes(app):
             return jsonify({'erro': 'O ID de Turma e Professor são obrigatórios e devem ser números inteiros.'}), 400
 
         try:
-            resp_turma = requests.get(f"{base}/turmas/{turma_id}")
-            resp_professor = requests.get(f"{base}/professores/{professor_id}")
+            status_turma, status_professor = gerenciamento.consultar_varios(
+                base, [('turmas', turma_id), ('professores', professor_id)])
         except requests.exceptions.RequestException:
             return jsonify({'erro': 'erro de comunicação com o microsserviço Gerenciamento.'}), 502
         
-        if resp_turma.status_code == 404:
+        if status_turma == 404:
             return jsonify({'erro': f'Turma com id {turma_id} não encontrada.'}), 404
-        elif resp_turma.status_code != 200:
-            return jsonify({'erro': f'Falha de comunicação com o microsserviço de Gerenciamento. {resp_turma.status_code}'}), 502
+        elif status_turma != 200:
+            return jsonify({'erro': f'Falha de comunicação com o microsserviço de Gerenciamento. {status_turma}'}), 502
         
-        if resp_professor.status_code == 404:
+        if status_professor == 404:
             return jsonify({'erro': f'Professor com id {professor_id} não encontrado.'}), 404
-        elif resp_professor.status_code != 200:
-            return jsonify({'erro': f'Falha de comunicação com o microsserviço de Gerenciamento. {resp_professor.status_code}'}), 502  
+        elif status_professor != 200:
+            return jsonify({'erro': f'Falha de comunicação com o microsserviço de Gerenciamento. {status_professor}'}), 502  
 
         try:
             data_entrega = datetime.strptime(dados['data_entrega'], '%Y-%m-%d').date()
@@ -246,19 +341,19 @@ def setup_routes(app):
             return jsonify({'erro': 'O ID de Turma e Professor são obrigatórios e devem ser números inteiros.'}), 400
 
         try:
-            resp_turma = requests.get(f"{base}/turmas/{turma_id}")
-            resp_professor = requests.get(f"{base}/professores/{professor_id}")
+            status_turma, status_professor = gerenciamento.consultar_varios(
+                base, [('turmas', turma_id), ('professores', professor_id)])
         except requests.exceptions.RequestException:
             return jsonify({'mensagem': 'erro de comunicação com o microsserviço Gerenciamento.'}), 502
         
-        if resp_turma.status_code == 404:
+        if status_turma == 404:
             return jsonify({'erro': f'Turma com id {turma_id} não encontrada.'}), 404
-        elif resp_turma.status_code != 200:
+        elif status_turma != 200:
             return jsonify({'erro': 'Falha de comunicação com o microsserviço de Gerenciamento.'}), 502
         
-        if resp_professor.status_code == 404:
+        if status_professor == 404:
             return jsonify({'erro': f'Professor com id {professor_id} não encontrado.'}), 404
-        elif resp_professor.status_code != 200:
+        elif status_professor != 200:
             return jsonify({'erro': 'Falha de comunicação com o microsserviço de Gerenciamento.'}), 502  
 
         try:
@@ -321,6 +416,7 @@ def setup_routes(app):
     # CRUD NOTAS
 
     @app.route('/notas', methods=['GET'])
+    @cache_http('notas', 'atividades')
     def get_notas():
         """
         Lista todas as notas
@@ -328,25 +424,57 @@ def setup_routes(app):
         tags:
           - notas
         summary: Lista todas as notas cadastradas
+        parameters:
+          - in: query
+            name: stream
+            schema: { type: boolean }
+            required: false
+            description: Transmite a lista em NDJSON (equivale a Accept application/x-ndjson)
+          - in: query
+            name: aluno_id
+            schema: { type: integer }
+            required: false
+            description: Retorna apenas as notas do aluno
+          - in: query
+            name: atividade_id
+            schema: { type: integer }
+            required: false
+            description: Retorna apenas as notas da atividade
+          - in: query
+            name: turma_id
+            schema: { type: integer }
+            required: false
+            description: Retorna apenas as notas das atividades da turma
         responses:
           200:
             description: Lista de notas
+          400:
+            description: Parâmetro de filtro inválido
           404:
             description: Nenhuma nota encontrada.
         """
 
-        notas = Notas.query.all()
+        try:
+            condicoes = condicoes_igualdade(Notas, ('aluno_id', 'atividade_id'))
+            turma_id = filtro_inteiro('turma_id')
+        except FiltroInvalido as e:
+            return jsonify({'erro': str(e)}), 400
+        if turma_id is not None:
+            condicoes.append(Notas.atividade_id.in_(
+                db.select(Atividades.id).where(Atividades.turma_id == turma_id)))
+
+        if quer_ndjson():
+            return resposta_ndjson(
+                SERIALIZADOR_NOTA.select().where(*condicoes).order_by(Notas.id), SERIALIZADOR_NOTA)
+
+        notas = SERIALIZADOR_NOTA.listar(*condicoes)
         if not notas:
             return jsonify({'erro': 'Nenhuma nota encontrada no sistema.'}), 404
         
-        return jsonify([{
-            'id': nota.id,
-            'nota': nota.nota,
-            'aluno_id': nota.aluno_id,
-            'atividade_id': nota.atividade_id
-        } for nota in notas]), 200
+        return jsonify(notas), 200
     
     @app.route('/notas/<int:id>', methods=['GET'])
+    @cache_http('notas')
     def get_nota(id):
         """
         Obtém uma Nota pelo ID
@@ -372,12 +500,7 @@ def setup_routes(app):
         if not nota:
             return jsonify({'erro': 'Nenhuma nota encontrada.'}), 404
         
-        return jsonify({
-            'id': nota.id,
-            'nota': nota.nota,
-            'aluno_id': nota.aluno_id,
-            'atividade_id': nota.atividade_id
-        }), 200
+        return jsonify(nota.to_dict()), 200
     
     @app.route('/notas', methods=['POST'])
     def create_nota():
@@ -422,13 +545,13 @@ def setup_routes(app):
             return jsonify({'erro': 'O ID do aluno e da atividade são obrigatórios e deves ser um número inteiro.'}), 400
         
         try:
-            resp = requests.get(f'{base}/alunos/{aluno_id}')
+            status = gerenciamento.consultar(base, 'alunos', aluno_id)
         except requests.exceptions.RequestException:
             return jsonify({'erro': 'Erro de comunicação com o microsserviço de Gerenciamento.'}), 502
         
-        if resp.status_code == 404:
+        if status == 404:
             return jsonify({'erro': f'Aluno com ID {aluno_id} não foi encontrado.'}), 404
-        elif resp.status_code != 200:
+        elif status != 200:
             return jsonify({'erro': 'Erro de comunicação com o microsserviço de Gerenciamento.'}), 502
         
         try:
@@ -451,6 +574,96 @@ def setup_routes(app):
 
         return jsonify({'mensagem': 'Nota cadastrada com sucesso!'}), 201
     
+    @app.route('/notas/batch', methods=['POST'])
+    def create_notas_batch():
+        """
+        Cadastra várias notas de uma vez
+        ---
+        tags:
+          - notas
+        summary: Importa notas em lote (lista JSON ou CSV com as colunas nota, aluno_id, atividade_id)
+        consumes:
+          - application/json
+          - text/csv
+          - multipart/form-data
+        parameters:
+          - in: body
+            name: body
+            required: true
+            schema:
+              type: array
+              items:
+                type: object
+                properties:
+                  nota:
+                    type: number
+                    example: 7.5
+                  aluno_id:
+                    type: integer
+                    example: 2
+                  atividade_id:
+                    type: integer
+                    example: 5
+        responses:
+            201:
+              description: Notas válidas cadastradas; as linhas com problema são listadas em "erros"
+            400:
+              description: Nenhuma nota válida ou formato inválido
+            502:
+              description: Erro de comunicação com o Gerenciamento
+        """
+
+        linhas = _ler_lote_notas()
+        if linhas is None:
+            return jsonify({'erro': 'Envie uma lista JSON de notas ou um arquivo CSV.'}), 400
+        if len(linhas) > LIMITE_LOTE_NOTAS:
+            return jsonify({'erro': f'No máximo {LIMITE_LOTE_NOTAS} notas por requisição.'}), 400
+
+        erros = []
+        validas = []
+        for numero, linha in enumerate(linhas, start=1):
+            try:
+                validas.append((numero, {
+                    'nota': float(linha['nota']),
+                    'aluno_id': int(linha['aluno_id']),
+                    'atividade_id': int(linha['atividade_id'])
+                }))
+            except (KeyError, TypeError, ValueError):
+                erros.append({'linha': numero, 'erro': 'nota deve ser decimal e aluno_id/atividade_id inteiros.'})
+
+        base = current_app.config['GERENCIAMENTO_BASE_URL']
+        try:
+            _, alunos_ausentes = gerenciamento.verificar_existencia(
+                base, 'alunos', {n['aluno_id'] for _, n in validas})
+        except requests.exceptions.RequestException:
+            return jsonify({'erro': 'Erro de comunicação com o microsserviço de Gerenciamento.'}), 502
+
+        ids_atividades = sorted({n['atividade_id'] for _, n in validas})
+        atividades = set()
+        for i in range(0, len(ids_atividades), TAMANHO_LOTE_IN):
+            lote = ids_atividades[i:i + TAMANHO_LOTE_IN]
+            atividades.update(db.session.execute(
+                db.select(Atividades.id).where(Atividades.id.in_(lote))).scalars())
+
+        notas = []
+        for numero, nota in validas:
+            if nota['aluno_id'] in alunos_ausentes:
+                erros.append({'linha': numero, 'erro': f"Aluno com ID {nota['aluno_id']} não foi encontrado."})
+            elif nota['atividade_id'] not in atividades:
+                erros.append({'linha': numero, 'erro': f"Atividade com o ID {nota['atividade_id']} não foi encontrada."})
+            else:
+                notas.append(nota)
+
+        erros.sort(key=lambda e: e['linha'])
+        if not notas:
+            return jsonify({'erro': 'Nenhuma nota válida para cadastrar.', 'erros': erros}), 400
+
+        # Um único INSERT executemany e um único commit para o lote inteiro
+        db.session.execute(db.insert(Notas), notas)
+        db.session.commit()
+
+        return jsonify({'mensagem': 'Notas cadastradas com sucesso!', 'inseridas': len(notas), 'erros': erros}), 201
+
     @app.route('/notas/<int:id>', methods=['PUT'])
     def update_nota(id):
         """
@@ -508,13 +721,13 @@ def setup_routes(app):
             return jsonify({'erro': 'O ID do aluno e da atividade são obrigatórios e devem ser um número inteiro.'}), 400
         
         try:
-            resp = requests.get(f'{base}/alunos/{aluno_id}')
+            status = gerenciamento.consultar(base, 'alunos', aluno_id)
         except requests.exceptions.RequestException:
             return jsonify({'erro': 'Erro de comunicação com o microsserviço de Gerenciamento.'}), 502
         
-        if resp.status_code == 404:
+        if status == 404:
             return jsonify({'erro': f'Aluno com ID {aluno_id} não foi encontrado.'}), 404
-        elif resp.status_code != 200:
+        elif status != 200:
             return jsonify({'erro': 'Erro de comunicação com o microsserviço de Gerenciamento.'}), 502
         
         atividade = Atividades.query.get(atividade_id)
@@ -563,4 +776,114 @@ def setup_routes(app):
         db.session.delete(nota)
         db.session.commit()
 
-        return jsonify({'mensagem': 'Nota deletada com sucesso!'}), 200
\ No newline at end of file
+        return jsonify({'mensagem': 'Nota deletada com sucesso!'}), 200
+
+    # MÉDIAS PONDERADAS
+
+    def _consulta_media():
+        """SUM(nota * peso) / SUM(peso) e a quantidade de notas, juntando Notas e Atividades."""
+        return (db.select(
+                    (db.func.sum(Notas.nota * Atividades.peso_porcento)
+                     / db.func.nullif(db.func.sum(Atividades.peso_porcento), 0)).label('media'),
+                    db.func.count(Notas.id).label('quantidade_notas'))
+                .join(Atividades, Atividades.id == Notas.atividade_id))
+
+    @app.route('/alunos/<int:id>/media', methods=['GET'])
+    @cache_http('notas', 'atividades')
+    def get_media_aluno(id):
+        """
+        Obtém a média ponderada de um aluno
+        ---
+        tags:
+          - médias
+        summary: Média das notas do aluno ponderada pelo peso de cada atividade
+        parameters:
+          - in: path
+            name: id
+            schema:
+              type: integer
+            required: true
+            description: ID do aluno
+        responses:
+          200:
+            description: Média ponderada do aluno
+          404:
+            description: Nenhuma nota encontrada para o aluno
+        """
+
+        linha = db.session.execute(_consulta_media().where(Notas.aluno_id == id)).one()
+        if not linha.quantidade_notas:
+            return jsonify({'erro': f'Nenhuma nota encontrada para o aluno com ID {id}.'}), 404
+
+        return jsonify({
+            'aluno_id': id,
+            'media': linha.media,
+            'quantidade_notas': linha.quantidade_notas
+        }), 200
+
+    @app.route('/turmas/<int:id>/medias', methods=['GET'])
+    @cache_http('notas', 'atividades')
+    def get_medias_turma(id):
+        """
+        Lista as médias ponderadas dos alunos de uma turma
+        ---
+        tags:
+          - médias
+        summary: Média ponderada de cada aluno nas atividades da turma
+        parameters:
+          - in: path
+            name: id
+            schema:
+              type: integer
+            required: true
+            description: ID da turma
+        responses:
+          200:
+            description: Médias dos alunos da turma
+          404:
+            description: Nenhuma nota encontrada para a turma
+        """
+
+        linhas = db.session.execute(
+            _consulta_media()
+            .add_columns(Notas.aluno_id)
+            .where(Atividades.turma_id == id)
+            .group_by(Notas.aluno_id)
+            .order_by(Notas.aluno_id)
+        ).all()
+        if not linhas:
+            return jsonify({'erro': f'Nenhuma nota encontrada para a turma com ID {id}.'}), 404
+
+        return jsonify([{
+            'aluno_id': linha.aluno_id,
+            'media': linha.media,
+            'quantidade_notas': linha.quantidade_notas
+        } for linha in linhas]), 200
+
+    @app.route('/cache/gerenciamento', methods=['GET'])
+    def cache_gerenciamento():
+        """
+        Estatísticas do cache de consultas ao Gerenciamento
+        ---
+        tags:
+          - cache
+        summary: Acertos, falhas e ocupação do cache de turmas, professores e alunos
+        responses:
+          200:
+            description: Estatísticas do cache
+        """
+        return jsonify(gerenciamento.cache.estatisticas()), 200
+
+    @app.route('/replica/gerenciamento', methods=['GET'])
+    def replica_gerenciamento():
+        """
+        Situação da réplica local do Gerenciamento
+        ---
+        tags:
+          - cache
+        summary: Cursor, última sincronização e registros da réplica de alunos, turmas e professores
+        responses:
+          200:
+            description: Situação da réplica (GERENCIAMENTO_REPLICA_INTERVALO > 0)
+        """
+        return jsonify(replica_model.estatisticas()), 200
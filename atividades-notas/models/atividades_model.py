@@ -1,4 +1,7 @@
+from werkzeug.http import http_date
+
 from .database import db
+from .serializacao import Serializador
 
 
 class Atividades(db.Model):
@@ -9,7 +12,17 @@ class Atividades(db.Model):
     descricao = db.Column(db.String(100), nullable=False)
     peso_porcento = db.Column(db.Float, nullable=False)
     data_entrega = db.Column(db.Date, nullable=False)
-    turma_id = db.Column(db.Integer, nullable=False)
+    turma_id = db.Column(db.Integer, nullable=False, index=True)
     professor_id = db.Column(db.Integer, nullable=False)
 
-    notas = db.relationship('Notas', backref='atividade', lazy=True, cascade='all, delete-orphan')
\ No newline at end of file
+    notas = db.relationship('Notas', backref='atividade', lazy=True, cascade='all, delete-orphan')
+
+    def to_dict(self):
+        return SERIALIZADOR_ATIVIDADE.de_objeto(self)
+
+
+# data_entrega no formato HTTP ("Sun, 20 Jul 2025 00:00:00 GMT"), o mesmo que o jsonify
+# sempre gerou para datas, para não quebrar os clientes existentes
+SERIALIZADOR_ATIVIDADE = Serializador(Atividades, ('id', 'nome_atividade', 'descricao', 'peso_porcento',
+                                                   'data_entrega', 'turma_id', 'professor_id'),
+                                      formatar_data=http_date)
@@ -1,4 +1,5 @@
 from .database import db
+from .serializacao import Serializador
 
 
 class Notas(db.Model):
@@ -7,4 +8,15 @@ class Notas(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     nota = db.Column(db.Float, nullable=False)
     aluno_id = db.Column(db.Integer, nullable=False)
-    atividade_id = db.Column(db.Integer, db.ForeignKey('atividades.id', ondelete='CASCADE'), nullable=False)
\ No newline at end of file
+    atividade_id = db.Column(db.Integer, db.ForeignKey('atividades.id', ondelete='CASCADE'), nullable=False, index=True)
+
+    __table_args__ = (
+        # Cobre também as buscas só por aluno_id (prefixo do índice)
+        db.Index('ix_notas_aluno_id_atividade_id', 'aluno_id', 'atividade_id'),
+    )
+
+    def to_dict(self):
+        return SERIALIZADOR_NOTA.de_objeto(self)
+
+
+SERIALIZADOR_NOTA = Serializador(Notas, ('id', 'nota', 'aluno_id', 'atividade_id'))
@@ -0,0 +1,72 @@
+import itertools
+import os
+import sys
+
+import pytest
+from sqlalchemy import event
+
+# Os testes rodam a partir da pasta do serviço (cd atividades-notas && python -m pytest),
+# com os módulos do serviço (app, models, controller) importáveis como no app.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, criar_schema
+from config import Config, _opcoes_engine
+from models.database import db
+
+
+@pytest.fixture(scope='session')
+def criar_app(tmp_path_factory):
+    """
+    Fábrica de apps de teste com o schema criado: criar_app(**config) usa um
+    SQLite temporário novo, a menos que SQLALCHEMY_DATABASE_URI seja passado.
+    Os engines são descartados no fim da sessão.
+    """
+    pasta = tmp_path_factory.mktemp('bancos')
+    numeros = itertools.count()
+    apps = []
+
+    def criar(**config):
+        url = config.pop('SQLALCHEMY_DATABASE_URI', None) or f'sqlite:///{pasta}/teste_{next(numeros)}.db'
+        config_teste = type('ConfigTeste', (Config,), dict(
+            TESTING=True, SQLALCHEMY_DATABASE_URI=url, SQLALCHEMY_ENGINE_OPTIONS=_opcoes_engine(url), **config))
+        app = create_app(config_teste)
+        with app.app_context():
+            criar_schema()
+        apps.append(app)
+        return app
+
+    yield criar
+    for app in apps:
+        with app.app_context():
+            db.session.remove()
+            db.engine.dispose()
+
+
+@pytest.fixture
+def app(criar_app):
+    return criar_app()
+
+
+@pytest.fixture
+def cliente(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def contar_consultas():
+    """contar_consultas(app, funcao): comandos SQL executados por funcao() no banco do app."""
+    def contar(app, funcao):
+        total = [0]
+
+        def incrementar(*_):
+            total[0] += 1
+
+        with app.app_context():
+            engine = db.engine
+        event.listen(engine, 'before_cursor_execute', incrementar)
+        try:
+            funcao()
+        finally:
+            event.remove(engine, 'before_cursor_execute', incrementar)
+        return total[0]
+    return contar
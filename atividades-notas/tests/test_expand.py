@@ -0,0 +1,37 @@
+"""
+GET /atividades?expand=notas deve fazer o mesmo número de consultas com
+poucas ou muitas atividades (sem N+1 nem lotes de IN).
+"""
+from datetime import date
+
+from models.database import db
+from models.atividades_model import Atividades
+from models.notas_model import Notas
+
+
+def _popular(app, quantidade):
+    with app.app_context():
+        db.session.execute(db.insert(Atividades), [{
+            'nome_atividade': f'Atividade {i}', 'descricao': 'teste', 'peso_porcento': 1.0,
+            'data_entrega': date(2025, 7, 20), 'turma_id': 1, 'professor_id': 1
+        } for i in range(quantidade)])
+        db.session.execute(db.insert(Notas), [{
+            'nota': 5.0, 'aluno_id': j, 'atividade_id': i + 1
+        } for i in range(quantidade) for j in range(3)])
+        db.session.commit()
+
+
+def test_expand_notas_consultas_constantes(criar_app, contar_consultas):
+    consultas = []
+    for quantidade in (10, 1000):
+        app = criar_app()
+        _popular(app, quantidade)
+        cliente = app.test_client()
+
+        def listar():
+            atividades = cliente.get('/atividades?expand=notas').get_json()
+            assert len(atividades) == quantidade
+            assert all(len(a['notas']) == 3 for a in atividades)
+
+        consultas.append(contar_consultas(app, listar))
+    assert consultas[0] == consultas[1]
@@ -0,0 +1,33 @@
+"""Sincronização incremental da réplica local (clients/gerenciamento.py)."""
+from clients import gerenciamento
+from models import replica_model as replica
+
+
+class _Resposta:
+    def __init__(self, dados):
+        self.dados = dados
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.dados
+
+
+def test_cursor_parado_encerra_a_rodada(app, monkeypatch):
+    # O Gerenciamento segura o cursor antes das mudanças recentes e as reenvia
+    chamadas = []
+
+    def requisitar(metodo, url, params=None, **kwargs):
+        chamadas.append(params['desde'])
+        assert len(chamadas) < 5, 'a rodada não terminou'
+        return _Resposta({'itens': [{'seq': 8, 'recurso': 'turmas', 'id': 3, 'dados': None}],
+                          'cursor': 7, 'ultimo': 8})
+
+    monkeypatch.setattr(gerenciamento, 'requisitar', requisitar)
+    with app.app_context():
+        assert replica.assumir_sincronizacao('teste', validade=60)
+        replica.concluir(7)
+        gerenciamento._atualizar_replica('http://gerenciamento')
+        assert replica.estado().cursor == 7
+    assert chamadas == [7]
@@ -0,0 +1,39 @@
+"""
+data_entrega continua no formato que o jsonify gera para datas
+("Sun, 20 Jul 2025 00:00:00 GMT"), em todas as respostas de atividades.
+"""
+import json
+from datetime import date
+
+import pytest
+from flask import Flask
+
+from models.database import db
+from models.atividades_model import Atividades
+
+DATA = date(2025, 7, 20)
+
+
+@pytest.fixture(params=[False, True], ids=['json', 'orjson'])
+def cliente(request, criar_app):
+    if request.param:
+        pytest.importorskip('orjson')
+    app = criar_app(JSON_ORJSON=request.param)
+    with app.app_context():
+        db.session.add(Atividades(nome_atividade='Prova', descricao='Prova 1', peso_porcento=1.0,
+                                  data_entrega=DATA, turma_id=1, professor_id=1))
+        db.session.commit()
+    return app.test_client()
+
+
+def test_data_entrega_igual_ao_jsonify(cliente):
+    # O provedor JSON padrão do Flask guarda só uma referência fraca ao app
+    padrao = Flask(__name__)
+    esperado = json.loads(padrao.json.dumps(DATA))
+    assert esperado == 'Sun, 20 Jul 2025 00:00:00 GMT'
+
+    assert cliente.get('/atividades').get_json()[0]['data_entrega'] == esperado
+    assert cliente.get('/atividades?expand=notas').get_json()[0]['data_entrega'] == esperado
+    assert cliente.get('/atividades/1').get_json()['data_entrega'] == esperado
+    linha = cliente.get('/atividades?stream=1').get_data(as_text=True).splitlines()[0]
+    assert json.loads(linha)['data_entrega'] == esperado
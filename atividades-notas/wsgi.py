@@ -0,0 +1,4 @@
+from app import create_app
+
+# Ponto de entrada WSGI do modo de produção: gunicorn -c gunicorn.conf.py wsgi:app
+app = create_app()
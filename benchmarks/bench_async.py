@@ -0,0 +1,210 @@
+"""
+Compara os workers gthread e gevent nas escritas que validam no Gerenciamento.
+
+Sobe um Gerenciamento falso que responde cada consulta após uma latência
+fixa (--latencia-ms) e o serviço escolhido (Atividades-Notas ou Reservas)
+com o Gunicorn, sem o cache de consultas, de modo que toda escrita espera
+uma chamada HTTP. Para cada modo e cada nível de concorrência, dispara
+POST /notas (ou POST /reservas) por um tempo fixo e mede a vazão e as
+latências p50/p95/p99.
+
+Uso (a partir da raiz do repositório):
+    python benchmarks/bench_async.py --concorrencias 50,200,500 --latencia-ms 100
+    python benchmarks/bench_async.py --servico reservas --workers 1 --saida async.json
+"""
+import argparse
+import itertools
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+import requests
+
+from bench_carga import RAIZ, aguardar, percentil
+
+# Gerenciamento falso: responde 200 a GET /<recurso>/<id> após a latência pedida
+GERENCIAMENTO_FALSO = """
+import json, sys, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+latencia = float(sys.argv[2]) / 1000
+
+class Falso(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        time.sleep(latencia)
+        corpo = json.dumps({'id': int(self.path.rstrip('/').rsplit('/', 1)[-1]), 'ativo': True}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, *args):
+        pass
+
+ThreadingHTTPServer.request_queue_size = 2048
+ThreadingHTTPServer.daemon_threads = True
+ThreadingHTTPServer(('127.0.0.1', int(sys.argv[1])), Falso).serve_forever()
+"""
+
+# Cria o schema e, em Atividades-Notas, a atividade usada pelas notas
+PREPARAR = {
+    'atividades-notas': """
+from datetime import date
+from app import create_app, criar_schema
+from models.database import db
+from models.atividades_model import Atividades
+app = create_app()
+with app.app_context():
+    criar_schema()
+    db.session.add(Atividades(id=1, nome_atividade='Carga', descricao='Carga', peso_porcento=1.0,
+                              data_entrega=date(2025, 1, 1), turma_id=1, professor_id=1))
+    db.session.commit()
+""",
+    'reservas': """
+from app import create_app, criar_schema
+app = create_app()
+with app.app_context():
+    criar_schema()
+""",
+}
+
+MODOS = {
+    'gthread': {'GUNICORN_WORKER_CLASS': 'gthread'},
+    'gevent': {'GUNICORN_WORKER_CLASS': 'gevent'},
+}
+
+
+def _corpo_escrita(servico, sequencia):
+    numero = next(sequencia)
+    if servico == 'reservas':
+        # Sala e data únicas por requisição, para não gerar 409
+        return '/reservas', {'num_sala': numero % 1000 + 1, 'lab': False, 'turma_id': numero % 100 + 1,
+                             'data': (date(2030, 1, 1) + timedelta(days=numero // 1000)).isoformat()}
+    return '/notas', {'nota': 7.5, 'aluno_id': numero % 10000 + 1, 'atividade_id': 1}
+
+
+def subir_servico(servico, url_banco, porta, modo, args, url_gerenciamento, log):
+    env = dict(os.environ, DATABASE_URL=url_banco, ENABLE_DOCS='0', SQL_LENTO_MS='0',
+               GERENCIAMENTO_BASE_URL=url_gerenciamento, GERENCIAMENTO_CACHE_TTL='0',
+               GERENCIAMENTO_CACHE_TTL_NEGATIVO='0', GERENCIAMENTO_TIMEOUT_LEITURA='30',
+               GUNICORN_WORKERS=str(args.workers), GUNICORN_THREADS=str(args.threads),
+               GUNICORN_LOGLEVEL='warning', **MODOS[modo])
+    comando = ['gunicorn', '-c', 'gunicorn.conf.py', '--access-logfile', '/dev/null',
+               '--bind', f'127.0.0.1:{porta}', 'wsgi:app']
+    return subprocess.Popen(comando, cwd=os.path.join(RAIZ, servico), env=env,
+                            stdout=log, stderr=subprocess.STDOUT)
+
+
+def disparar(url, servico, concorrencia, segundos):
+    """Escritas em laço fechado por `concorrencia` threads durante `segundos`."""
+    sequencia = itertools.count()
+    duracoes, status = [], {}
+    trava = threading.Lock()
+    fim = time.monotonic() + segundos
+
+    def trabalhador():
+        sessao = requests.Session()
+        locais, status_locais = [], {}
+        while time.monotonic() < fim:
+            caminho, corpo = _corpo_escrita(servico, sequencia)
+            antes = time.perf_counter()
+            try:
+                codigo = str(sessao.post(url + caminho, json=corpo, timeout=60).status_code)
+            except requests.RequestException as e:
+                codigo = type(e).__name__
+            locais.append(time.perf_counter() - antes)
+            status_locais[codigo] = status_locais.get(codigo, 0) + 1
+        with trava:
+            duracoes.extend(locais)
+            for codigo, total in status_locais.items():
+                status[codigo] = status.get(codigo, 0) + total
+
+    inicio = time.monotonic()
+    threads = [threading.Thread(target=trabalhador) for _ in range(concorrencia)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    # As requisições iniciadas antes do fim terminam depois dele
+    decorrido = time.monotonic() - inicio
+
+    ordenados = sorted(duracoes)
+    ms = lambda v: round(v * 1000, 1) if v is not None else None
+    return {
+        'concorrencia': concorrencia,
+        'vazao_rps': round(len(ordenados) / decorrido, 1),
+        'erros': sum(total for codigo, total in status.items() if codigo != '201'),
+        'status': status,
+        'p50_ms': ms(percentil(ordenados, 0.50)),
+        'p95_ms': ms(percentil(ordenados, 0.95)),
+        'p99_ms': ms(percentil(ordenados, 0.99)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--servico', choices=tuple(PREPARAR), default='atividades-notas')
+    parser.add_argument('--modos', default='gthread,gevent')
+    parser.add_argument('--concorrencias', default='50,200,500')
+    parser.add_argument('--latencia-ms', type=float, default=100, help='latência do Gerenciamento falso')
+    parser.add_argument('--segundos', type=float, default=15)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=8, help='threads por worker no modo gthread')
+    parser.add_argument('--porta-base', type=int, default=5200)
+    parser.add_argument('--saida', help='arquivo JSON onde salvar o resultado')
+    args = parser.parse_args()
+
+    modos = args.modos.split(',')
+    concorrencias = [int(c) for c in args.concorrencias.split(',')]
+    pasta = tempfile.mkdtemp(prefix='bench_async_')
+    porta_falso, porta_servico = args.porta_base, args.porta_base + 1
+    url_falso, url_servico = f'http://127.0.0.1:{porta_falso}', f'http://127.0.0.1:{porta_servico}'
+
+    resultado = {
+        'configuracao': {'servico': args.servico, 'latencia_ms': args.latencia_ms, 'segundos': args.segundos,
+                         'workers': args.workers, 'threads': args.threads, 'cpus': os.cpu_count()},
+        'modos': {},
+    }
+    falso = subprocess.Popen([sys.executable, '-c', GERENCIAMENTO_FALSO, str(porta_falso), str(args.latencia_ms)])
+    try:
+        for modo in modos:
+            url_banco = 'sqlite:///' + os.path.join(pasta, f'{modo}.db')
+            subprocess.run([sys.executable, '-c', PREPARAR[args.servico]], check=True,
+                           cwd=os.path.join(RAIZ, args.servico),
+                           env=dict(os.environ, DATABASE_URL=url_banco, ENABLE_DOCS='0'))
+            with open(os.path.join(pasta, f'{modo}.log'), 'w') as log:
+                processo = subir_servico(args.servico, url_banco, porta_servico, modo, args, url_falso, log)
+                try:
+                    aguardar(url_servico, processo)
+                    resultado['modos'][modo] = [disparar(url_servico, args.servico, c, args.segundos)
+                                                for c in concorrencias]
+                finally:
+                    processo.terminate()
+                    processo.wait(timeout=30)
+            for medida in resultado['modos'][modo]:
+                print(f"{modo:8} concorrência {medida['concorrencia']:4}: {medida['vazao_rps']:7.1f} req/s  "
+                      f"p50 {medida['p50_ms']} ms  p99 {medida['p99_ms']} ms  erros {medida['erros']}",
+                      file=sys.stderr)
+    finally:
+        falso.terminate()
+        falso.wait(timeout=10)
+        shutil.rmtree(pasta, ignore_errors=True)
+
+    texto = json.dumps(resultado, indent=2, ensure_ascii=False)
+    if args.saida:
+        with open(args.saida, 'w') as arquivo:
+            arquivo.write(texto + '\n')
+    print(texto)
+
+
+if __name__ == '__main__':
+    main()
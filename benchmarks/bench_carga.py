@@ -0,0 +1,327 @@
+"""
+Teste de carga ponta a ponta dos três serviços com carga mista de leitura e escrita.
+
+Popula um banco SQLite novo para cada serviço na escala pedida, sobe o
+Gerenciamento, o Reservas e o Atividades-Notas em portas locais (com os
+dois últimos apontando para o Gerenciamento local) e dispara requisições
+de várias threads por um tempo fixo. O resultado (vazão e latências
+p50/p95/p99 por operação) sai em JSON e pode ser comparado com um
+resultado salvo anteriormente (--baseline).
+
+Uso (a partir da raiz do repositório):
+    python benchmarks/bench_carga.py --segundos 30 --concorrencia 16 --saida carga.json
+    python benchmarks/bench_carga.py --turmas 10000 --alunos 1000000 --notas 5000000 --baseline carga.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+import requests
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Executado em cada subprocesso de população, com o diretório do serviço como cwd
+PRELUDIO = """
+import json, random, sys
+from datetime import date, timedelta
+from app import create_app, criar_schema
+from models.{modulo_db} import db
+p = json.loads(sys.argv[1])
+aleatorio = random.Random(42)
+app = create_app()
+
+def inserir(model, total, linha, lote=50000):
+    for inicio in range(0, total, lote):
+        db.session.execute(db.insert(model), [linha(i) for i in range(inicio, min(total, inicio + lote))])
+        db.session.commit()
+"""
+
+POPULAR = {
+    'gerenciamento': PRELUDIO.format(modulo_db='database') + """
+from models import Aluno, Professor, Turma
+with app.app_context():
+    criar_schema()
+    inserir(Professor, p['professores'], lambda i: {
+        'id': i + 1, 'nome': f'Professor {i}', 'idade': 40, 'materia': 'Carga', 'observacoes': None})
+    inserir(Turma, p['turmas'], lambda i: {
+        'id': i + 1, 'descricao': f'Turma {i}', 'professor_id': i % p['professores'] + 1, 'ativo': True})
+    inserir(Aluno, p['alunos'], lambda i: {
+        'id': i + 1, 'nome': f'Aluno {i}', 'idade': 18, 'turma_id': i % p['turmas'] + 1,
+        'data_nascimento': date(2005, 1, 1), 'nota_primeiro_semestre': 7.0,
+        'nota_segundo_semestre': 8.0, 'media_final': 7.5})
+""",
+    'atividades-notas': PRELUDIO.format(modulo_db='database') + """
+from models.atividades_model import Atividades
+from models.notas_model import Notas
+with app.app_context():
+    criar_schema()
+    inserir(Atividades, p['atividades'], lambda i: {
+        'id': i + 1, 'nome_atividade': f'Atividade {i}', 'descricao': 'Carga', 'peso_porcento': 1.0,
+        'data_entrega': date(2025, 1, 1), 'turma_id': i % p['turmas'] + 1,
+        'professor_id': i % p['professores'] + 1})
+    inserir(Notas, p['notas'], lambda i: {
+        'nota': aleatorio.uniform(0, 10), 'aluno_id': aleatorio.randint(1, p['alunos']),
+        'atividade_id': aleatorio.randint(1, p['atividades'])})
+""",
+    'reservas': PRELUDIO.format(modulo_db='reserva_model') + """
+from models.reserva_model import Reserva
+with app.app_context():
+    criar_schema()
+    # Sala e data distintas para cada reserva (índice único num_sala + data)
+    inserir(Reserva, p['reservas'], lambda i: {
+        'num_sala': i % p['salas'] + 1, 'lab': i % 2 == 0,
+        'data': date(2024, 1, 1) + timedelta(days=i // p['salas']), 'turma_id': i % p['turmas'] + 1})
+""",
+}
+
+SERVIR_FLASK = "import sys; from app import create_app; create_app().run(host='127.0.0.1', port=int(sys.argv[1]), threaded=True)"
+
+# Nome -> (tipo, serviço, função que monta (método, caminho, corpo)). `p` são
+# os parâmetros de escala e `estado` é exclusivo de cada thread.
+OPERACOES = {
+    'GET /turmas?limit=100': ('leitura', 'gerenciamento', lambda a, p, e: (
+        'GET', f'/turmas?limit=100&cursor={a.randrange(p["turmas"])}', None)),
+    'GET /turmas/<id>?expand=alunos': ('leitura', 'gerenciamento', lambda a, p, e: (
+        'GET', f'/turmas/{a.randint(1, p["turmas"])}?expand=alunos', None)),
+    'GET /alunos/<id>': ('leitura', 'gerenciamento', lambda a, p, e: (
+        'GET', f'/alunos/{a.randint(1, p["alunos"])}', None)),
+    'GET /alunos?turma_id': ('leitura', 'gerenciamento', lambda a, p, e: (
+        'GET', f'/alunos?turma_id={a.randint(1, p["turmas"])}', None)),
+    'GET /atividades/<id>': ('leitura', 'atividades-notas', lambda a, p, e: (
+        'GET', f'/atividades/{a.randint(1, p["atividades"])}', None)),
+    'GET /notas?aluno_id': ('leitura', 'atividades-notas', lambda a, p, e: (
+        'GET', f'/notas?aluno_id={a.randint(1, p["alunos"])}', None)),
+    'GET /alunos/<id>/media': ('leitura', 'atividades-notas', lambda a, p, e: (
+        'GET', f'/alunos/{a.randint(1, p["alunos"])}/media', None)),
+    'GET /reservas?num_sala': ('leitura', 'reservas', lambda a, p, e: (
+        'GET', f'/reservas?num_sala={a.randint(1, p["salas"])}', None)),
+    'POST /notas': ('escrita', 'atividades-notas', lambda a, p, e: (
+        'POST', '/notas', {'nota': round(a.uniform(0, 10), 1), 'aluno_id': a.randint(1, p['alunos']),
+                           'atividade_id': a.randint(1, p['atividades'])})),
+    'POST /reservas': ('escrita', 'reservas', lambda a, p, e: (
+        'POST', '/reservas', _nova_reserva(a, p, e))),
+}
+
+
+def _nova_reserva(aleatorio, p, estado):
+    # Cada thread usa a própria sala, acima das populadas, para não gerar 409
+    estado['reservas'] = estado.get('reservas', 0) + 1
+    return {'num_sala': p['salas'] + 1 + estado['thread'], 'lab': False,
+            'data': (date(2030, 1, 1) + timedelta(days=estado['reservas'])).isoformat(),
+            'turma_id': aleatorio.randint(1, p['turmas'])}
+
+
+def popular(servico, url_banco, escala):
+    inicio = time.perf_counter()
+    subprocess.run([sys.executable, '-c', POPULAR[servico], json.dumps(escala)],
+                   cwd=os.path.join(RAIZ, servico), env=_ambiente(url_banco), check=True)
+    return round(time.perf_counter() - inicio, 1)
+
+
+def _ambiente(url_banco, **extras):
+    return dict(os.environ, DATABASE_URL=url_banco, ENABLE_DOCS='0', SQL_LENTO_MS='0', **extras)
+
+
+def subir(servico, url_banco, porta, args, url_gerenciamento, log):
+    env = _ambiente(url_banco, PORT=str(porta), GERENCIAMENTO_BASE_URL=url_gerenciamento,
+                    GUNICORN_WORKERS=str(args.workers), GUNICORN_LOGLEVEL='warning')
+    if args.servidor == 'gunicorn':
+        comando = ['gunicorn', '-c', 'gunicorn.conf.py', '--access-logfile', '/dev/null',
+                   '--bind', f'127.0.0.1:{porta}', 'wsgi:app']
+    else:
+        comando = [sys.executable, '-c', SERVIR_FLASK, str(porta)]
+    return subprocess.Popen(comando, cwd=os.path.join(RAIZ, servico), env=env,
+                            stdout=log, stderr=subprocess.STDOUT)
+
+
+def aguardar(url, processo, limite=60):
+    fim = time.monotonic() + limite
+    while time.monotonic() < fim:
+        if processo.poll() is not None:
+            raise RuntimeError(f'O processo de {url} terminou com código {processo.returncode}.')
+        try:
+            if requests.get(url + '/metrics', timeout=1).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f'{url} não respondeu em {limite} s.')
+
+
+def percentil(ordenados, fracao):
+    if not ordenados:
+        return None
+    return ordenados[min(len(ordenados) - 1, int(fracao * len(ordenados)))]
+
+
+def executar_carga(urls, escala, args):
+    leituras = [n for n, (tipo, _, _) in OPERACOES.items() if tipo == 'leitura']
+    escritas = [n for n, (tipo, _, _) in OPERACOES.items() if tipo == 'escrita']
+    nomes = leituras + escritas
+    pesos = ([(1 - args.escritas) / len(leituras)] * len(leituras)
+             + [args.escritas / len(escritas)] * len(escritas))
+
+    medidas = {nome: [] for nome in nomes}
+    status = {nome: {} for nome in nomes}
+    trava = threading.Lock()
+    inicio_medicao = time.monotonic() + args.aquecimento
+    fim = inicio_medicao + args.segundos
+
+    def trabalhador(numero):
+        aleatorio = random.Random(numero)
+        estado = {'thread': numero}
+        sessao = requests.Session()
+        locais = {nome: [] for nome in nomes}
+        status_locais = {nome: {} for nome in nomes}
+        while True:
+            agora = time.monotonic()
+            if agora >= fim:
+                break
+            nome = aleatorio.choices(nomes, pesos)[0]
+            _, servico, montar = OPERACOES[nome]
+            metodo, caminho, corpo = montar(aleatorio, escala, estado)
+            antes = time.perf_counter()
+            try:
+                codigo = sessao.request(metodo, urls[servico] + caminho, json=corpo, timeout=30).status_code
+            except requests.RequestException as e:
+                codigo = type(e).__name__
+            duracao = time.perf_counter() - antes
+            if agora >= inicio_medicao:
+                locais[nome].append(duracao)
+                status_locais[nome][codigo] = status_locais[nome].get(codigo, 0) + 1
+        with trava:
+            for nome in nomes:
+                medidas[nome].extend(locais[nome])
+                for codigo, total in status_locais[nome].items():
+                    status[nome][str(codigo)] = status[nome].get(str(codigo), 0) + total
+
+    threads = [threading.Thread(target=trabalhador, args=(i,)) for i in range(args.concorrencia)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    def resumo(duracoes, contagem):
+        ordenados = sorted(duracoes)
+        erros = sum(total for codigo, total in contagem.items() if not codigo.isdigit() or int(codigo) >= 500)
+        ms = lambda v: round(v * 1000, 2) if v is not None else None
+        return {
+            'requisicoes': len(ordenados),
+            'vazao_rps': round(len(ordenados) / args.segundos, 1),
+            'erros': erros,
+            'status': contagem,
+            'p50_ms': ms(percentil(ordenados, 0.50)),
+            'p95_ms': ms(percentil(ordenados, 0.95)),
+            'p99_ms': ms(percentil(ordenados, 0.99)),
+            'media_ms': ms(statistics.fmean(ordenados)) if ordenados else None,
+        }
+
+    total_status = {}
+    for contagem in status.values():
+        for codigo, total in contagem.items():
+            total_status[codigo] = total_status.get(codigo, 0) + total
+    return {
+        'total': resumo([d for lista in medidas.values() for d in lista], total_status),
+        'operacoes': {nome: resumo(medidas[nome], status[nome]) for nome in nomes},
+    }
+
+
+def comparar(atual, base, tolerancia):
+    """Variação de vazão e p95 por operação; regressão se passar da tolerância."""
+    comparacao, regressoes = {}, []
+    for nome, medida in {'total': atual['total'], **atual['operacoes']}.items():
+        anterior = base['total'] if nome == 'total' else base.get('operacoes', {}).get(nome)
+        if not anterior or not anterior.get('vazao_rps') or not anterior.get('p95_ms') or not medida['p95_ms']:
+            continue
+        vazao = medida['vazao_rps'] / anterior['vazao_rps'] - 1
+        p95 = medida['p95_ms'] / anterior['p95_ms'] - 1
+        comparacao[nome] = {'vazao_variacao': round(vazao, 3), 'p95_variacao': round(p95, 3)}
+        if vazao < -tolerancia or p95 > tolerancia:
+            regressoes.append(nome)
+    return {'tolerancia': tolerancia, 'operacoes': comparacao, 'regressoes': regressoes}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    escala = parser.add_argument_group('escala dos dados')
+    escala.add_argument('--professores', type=int, default=500)
+    escala.add_argument('--turmas', type=int, default=1000)
+    escala.add_argument('--alunos', type=int, default=50000)
+    escala.add_argument('--atividades', type=int, default=5000)
+    escala.add_argument('--notas', type=int, default=200000)
+    escala.add_argument('--salas', type=int, default=200)
+    escala.add_argument('--reservas', type=int, default=20000)
+    parser.add_argument('--segundos', type=float, default=30)
+    parser.add_argument('--aquecimento', type=float, default=3)
+    parser.add_argument('--concorrencia', type=int, default=16)
+    parser.add_argument('--escritas', type=float, default=0.2, help='fração das requisições que são escritas')
+    parser.add_argument('--servidor', choices=('flask', 'gunicorn'), default='flask')
+    parser.add_argument('--workers', type=int, default=4, help='workers do Gunicorn por serviço')
+    parser.add_argument('--porta-base', type=int, default=5100)
+    parser.add_argument('--saida', help='arquivo JSON onde salvar o resultado')
+    parser.add_argument('--baseline', help='resultado anterior (JSON) para comparação')
+    parser.add_argument('--tolerancia', type=float, default=0.10)
+    parser.add_argument('--manter-dados', action='store_true', help='não apaga os bancos e logs ao final')
+    args = parser.parse_args()
+
+    parametros = {k: getattr(args, k) for k in
+                  ('professores', 'turmas', 'alunos', 'atividades', 'notas', 'salas', 'reservas')}
+    pasta = tempfile.mkdtemp(prefix='bench_carga_')
+    servicos = ('gerenciamento', 'reservas', 'atividades-notas')
+    bancos = {s: 'sqlite:///' + os.path.join(pasta, s.replace('-', '_') + '.db') for s in servicos}
+    portas = {s: args.porta_base + i for i, s in enumerate(servicos)}
+    urls = {s: f'http://127.0.0.1:{porta}' for s, porta in portas.items()}
+
+    resultado = {
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'ambiente': {'python': platform.python_version(), 'plataforma': platform.platform(),
+                     'cpus': os.cpu_count()},
+        'configuracao': {'escala': parametros, 'segundos': args.segundos, 'concorrencia': args.concorrencia,
+                         'escritas': args.escritas, 'servidor': args.servidor,
+                         'workers': args.workers if args.servidor == 'gunicorn' else None},
+    }
+    processos, logs = [], []
+    try:
+        resultado['populacao_s'] = {s: popular(s, bancos[s], parametros) for s in servicos}
+        for s in servicos:
+            logs.append(open(os.path.join(pasta, f'{s}.log'), 'w'))
+            processos.append(subir(s, bancos[s], portas[s], args, urls['gerenciamento'], logs[-1]))
+            aguardar(urls[s], processos[-1])
+        resultado.update(executar_carga(urls, parametros, args))
+    finally:
+        for processo in processos:
+            processo.terminate()
+        for processo in processos:
+            processo.wait(timeout=10)
+        for log in logs:
+            log.close()
+        if args.manter_dados:
+            print(f'Bancos e logs em {pasta}', file=sys.stderr)
+        else:
+            shutil.rmtree(pasta, ignore_errors=True)
+
+    if args.baseline:
+        with open(args.baseline) as arquivo:
+            resultado['comparacao'] = comparar(resultado, json.load(arquivo), args.tolerancia)
+
+    texto = json.dumps(resultado, indent=2, ensure_ascii=False)
+    if args.saida:
+        with open(args.saida, 'w') as arquivo:
+            arquivo.write(texto + '\n')
+    print(texto)
+    if resultado.get('comparacao', {}).get('regressoes'):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
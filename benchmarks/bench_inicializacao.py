@@ -0,0 +1,64 @@
+"""
+Mede o tempo de inicialização de cada serviço: do import do app.py até a
+resposta da primeira requisição, em um processo Python novo a cada rodada.
+
+Uso (a partir da raiz do repositório):
+    python benchmarks/bench_inicializacao.py --rodadas 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Serviço -> rota usada como primeira requisição
+SERVICOS = {
+    'gerenciamento': '/turmas',
+    'reservas': '/reservas',
+    'atividades-notas': '/atividades',
+}
+
+# Executado em cada subprocesso, com o diretório do serviço como cwd
+MEDICAO = """
+import json, sys, time
+inicio = time.perf_counter()
+from app import create_app
+app = create_app()
+importado = time.perf_counter()
+app.test_client().get(sys.argv[1])
+fim = time.perf_counter()
+print(json.dumps({'create_app_ms': (importado - inicio) * 1000, 'total_ms': (fim - inicio) * 1000}))
+"""
+
+
+def medir(servico, rota, docs):
+    env = dict(os.environ, ENABLE_DOCS='1' if docs else '0')
+    saida = subprocess.run(
+        [sys.executable, '-c', MEDICAO, rota],
+        cwd=os.path.join(RAIZ, servico), env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(saida.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rodadas', type=int, default=5)
+    args = parser.parse_args()
+
+    resultado = {}
+    for servico, rota in SERVICOS.items():
+        resultado[servico] = {}
+        for docs in (True, False):
+            medidas = [medir(servico, rota, docs) for _ in range(args.rodadas)]
+            resultado[servico]['com_docs' if docs else 'sem_docs'] = {
+                chave: round(statistics.median(m[chave] for m in medidas), 1)
+                for chave in ('create_app_ms', 'total_ms')
+            }
+    print(json.dumps(resultado, indent=2))
+
+
+if __name__ == '__main__':
+    main()
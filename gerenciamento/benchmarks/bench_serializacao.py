@@ -0,0 +1,94 @@
+"""
+Serialização de alunos: objetos ORM + dicionário montado à mão x Row + Serializador.
+
+Cria um banco SQLite temporário com os alunos, mede a consulta e a conversão
+em dicionários de cada forma e, em seguida, a geração do JSON com o
+provedor padrão do Flask e com o ProvedorOrjson (se o orjson estiver
+instalado).
+
+Uso (a partir da pasta gerenciamento):
+    python benchmarks/bench_serializacao.py --alunos 100000
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from models.database import db
+from models.aluno_model import Aluno, SERIALIZADOR_ALUNO
+from models.professor_model import Professor
+from models.turma_model import Turma
+from controller.provedor_json import ProvedorOrjson, orjson
+
+
+def cronometrar(funcao, repeticoes):
+    melhor, resultado = float('inf'), None
+    for _ in range(repeticoes):
+        db.session.expunge_all()
+        inicio = time.perf_counter()
+        resultado = funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return round(melhor * 1000, 1), resultado
+
+
+def manual():
+    # Forma usada antes nas rotas: hidrata os objetos e monta cada dicionário
+    return [{
+        'id': a.id,
+        'nome': a.nome,
+        'idade': a.idade,
+        'turma_id': a.turma_id,
+        'data_nascimento': a.data_nascimento.isoformat(),
+        'nota_primeiro_semestre': a.nota_primeiro_semestre,
+        'nota_segundo_semestre': a.nota_segundo_semestre,
+        'media_final': a.media_final
+    } for a in Aluno.query.all()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--alunos', type=int, default=100_000)
+    parser.add_argument('--repeticoes', type=int, default=3)
+    args = parser.parse_args()
+
+    caminho = os.path.join(tempfile.mkdtemp(), 'bench_serializacao.db')
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + caminho
+    db.init_app(app)
+
+    resultado = {'alunos': args.alunos}
+    with app.app_context():
+        db.create_all()
+        db.session.add(Professor(id=1, nome='Bench', idade=40, materia='bench'))
+        db.session.add(Turma(id=1, descricao='bench', professor_id=1))
+        db.session.commit()
+        db.session.execute(db.insert(Aluno), [{
+            'nome': f'Aluno {i}', 'idade': 18, 'turma_id': 1, 'data_nascimento': date(2005, 1, 1),
+            'nota_primeiro_semestre': 7.5, 'nota_segundo_semestre': 8.0, 'media_final': 7.75
+        } for i in range(args.alunos)])
+        db.session.commit()
+
+        ms_manual, dados_manual = cronometrar(manual, args.repeticoes)
+        ms_serializador, dados = cronometrar(SERIALIZADOR_ALUNO.listar, args.repeticoes)
+        assert dados == dados_manual
+        resultado['consulta_e_dicts_ms'] = {'orm_manual': ms_manual, 'row_serializador': ms_serializador}
+
+        provedores = {'json_padrao': DefaultJSONProvider(app)}
+        if orjson is not None:
+            provedores['orjson'] = ProvedorOrjson(app)
+        resultado['json_ms'] = {nome: cronometrar(lambda: p.dumps(dados), args.repeticoes)[0]
+                                for nome, p in provedores.items()}
+
+    print(json.dumps(resultado, indent=2, ensure_ascii=False))
+    os.remove(caminho)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,54 @@
 import os
 
+
+def _url_banco(padrao):
+    """DATABASE_URL do ambiente (aceitando o esquema legado postgres://) ou o SQLite padrão."""
+    url = os.getenv("DATABASE_URL") or padrao
+    if url.startswith("postgres://"):
+        url = "postgresql://" + url[len("postgres://"):]
+    return url
+
+
+def _opcoes_engine(url):
+    """Opções do pool de conexões; tamanho e overflow só se aplicam fora do SQLite."""
+    opcoes = {
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "1") == "1",
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+    }
+    if not url.startswith("sqlite"):
+        opcoes["pool_size"] = int(os.getenv("DB_POOL_SIZE", "5"))
+        opcoes["max_overflow"] = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+        opcoes["pool_timeout"] = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+    return opcoes
+
+
 class Config:
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///database.db'
+    # Sem DATABASE_URL, usa o SQLite na pasta instance/ do serviço
+    SQLALCHEMY_DATABASE_URI = _url_banco("sqlite:///database.db")
+    SQLALCHEMY_ENGINE_OPTIONS = _opcoes_engine(SQLALCHEMY_DATABASE_URI)
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Swagger em /apidocs, só com ENABLE_DOCS=1: o flasgger pesa na inicialização dos workers
+    ENABLE_DOCS = os.getenv("ENABLE_DOCS", "0") == "1"
+    # Serializa as respostas com o orjson (dependência opcional) em vez do json padrão
+    JSON_ORJSON = os.getenv("JSON_ORJSON", "0") == "1"
+    # max-age (segundos) do Cache-Control nas listagens; 0 manda o cliente revalidar sempre (ETag)
+    HTTP_CACHE_MAX_AGE = int(os.getenv("HTTP_CACHE_MAX_AGE", "0"))
+    # Compressão gzip/brotli das respostas JSON, NDJSON e CSV (Accept-Encoding)
+    COMPRESSAO = os.getenv("COMPRESSAO", "0") == "1"
+    COMPRESSAO_MINIMO = int(os.getenv("COMPRESSAO_MINIMO", "1024"))
+    COMPRESSAO_NIVEL = int(os.getenv("COMPRESSAO_NIVEL", "6"))
+    COMPRESSAO_NIVEL_BROTLI = int(os.getenv("COMPRESSAO_NIVEL_BROTLI", "4"))
+    # Contadores e histogramas de latência em GET /metrics (formato Prometheus)
+    METRICAS = os.getenv("METRICAS", "1") == "1"
+    # Comandos SQL mais lentos que isto (ms) vão para o log; 0 desliga
+    SQL_LENTO_MS = float(os.getenv("SQL_LENTO_MS", "200"))
+    # Perfil de SQL por requisição (log + Server-Timing): sempre, ou só com X-Debug-SQL: 1
+    SQL_PERFIL = os.getenv("SQL_PERFIL", "0") == "1"
+    # O cabeçalho X-Debug-SQL fica desligado por padrão: qualquer cliente poderia pedir o perfil
+    SQL_PERFIL_HEADER = os.getenv("SQL_PERFIL_HEADER", "0") == "1"
+    # Perfil de PRAGMAs do SQLite: "otimizado" (WAL, busy_timeout, ...) ou "padrao"
+    SQLITE_PERFIL = os.getenv("SQLITE_PERFIL", "otimizado")
+    # Segundos em que o cursor de /mudancas e /replicacao fica atrás das mudanças
+    # recentes (ver _cursor_seguro); deve ser maior que a transação de escrita mais longa
+    FEED_JANELA = float(os.getenv("FEED_JANELA", "5"))
     SECRET_KEY = os.urandom(24)
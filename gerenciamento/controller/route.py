@@ -1,15 +1,194 @@
-from flask import request, jsonify
-from models.professor_model import Professor
-from models.aluno_model import Aluno
-from models.turma_model import Turma
+from flask import current_app, request, jsonify
+from models.professor_model import Professor, SERIALIZADOR_PROFESSOR
+from models.aluno_model import Aluno, SERIALIZADOR_ALUNO
+from models.turma_model import Turma, SERIALIZADOR_TURMA
+from models.mudanca_model import Mudanca
 from models.database import db
-from datetime import datetime
+from controller.streaming import quer_ndjson, resposta_ndjson
+from controller.cache_http import cache_http
+from controller.filtros import FiltroInvalido, condicoes_igualdade, expansoes
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload, subqueryload
+from datetime import datetime, timedelta
+
+# Paginação por cursor (keyset em id) das listagens
+LIMITE_PADRAO = 100
+LIMITE_MAXIMO = 1000
+
+# Relacionamentos aceitos em ?expand= nas rotas de turmas
+EXPANSOES_TURMA = ('alunos',)
+
+
+def _turma_dict(turma, expandir=()):
+    """
+    Dicionário da turma; com 'alunos' em `expandir`, inclui os alunos.
+    A consulta deve carregar Turma.alunos antecipadamente (subqueryload ou
+    selectinload), senão cada turma dispara uma consulta própria (N+1).
+    """
+    dados = turma.to_dict()
+    if 'alunos' in expandir:
+        dados['alunos'] = [a.to_dict() for a in turma.alunos]
+    return dados
+
+
+def _commit(mensagem_conflito, status_conflito=409):
+    """
+    Faz o commit; se o banco recusar por chave estrangeira, desfaz a
+    transação e retorna a resposta de erro (senão, None).
+
+    As chaves estrangeiras são verificadas no PostgreSQL e no SQLite
+    (foreign_keys=ON do perfil otimizado): turma de aluno ou professor de
+    turma inexistente, e remoção de turma com alunos ou de professor com turmas.
+    """
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'erro': mensagem_conflito}), status_conflito
+    return None
+
+
+def _pediu_paginacao():
+    return any(p in request.args for p in ('limit', 'cursor', 'fields'))
+
+
+def _listar_paginado(serializador, condicoes=()):
+    """
+    Lista os registros do modelo de `serializador` com paginação por cursor.
+
+    `condicoes` são filtros adicionais aplicados no WHERE.
+
+    Busca apenas as colunas pedidas em `fields` e só `limit` linhas com
+    id maior que `cursor`, então a memória por requisição não depende do
+    tamanho da tabela.
+    """
+    try:
+        limite = int(request.args.get('limit', LIMITE_PADRAO))
+        cursor = int(request.args.get('cursor', 0))
+    except ValueError:
+        return jsonify({'erro': 'Os parâmetros limit e cursor devem ser números inteiros.'}), 400
+    limite = max(1, min(limite, LIMITE_MAXIMO))
+
+    model = serializador.model
+    selecionados = list(serializador.campos)
+    if request.args.get('fields'):
+        selecionados = [f.strip() for f in request.args['fields'].split(',') if f.strip()]
+        invalidos = [f for f in selecionados if f not in serializador.campos]
+        if invalidos:
+            return jsonify({'erro': f'Campos inválidos: {", ".join(invalidos)}.'}), 400
+        # O id é sempre retornado, pois é a chave do cursor
+        if 'id' not in selecionados:
+            selecionados.insert(0, 'id')
+
+    serializador = serializador.subconjunto(selecionados)
+    consulta = (serializador.select()
+                .where(model.id > cursor, *condicoes)
+                .order_by(model.id)
+                .limit(limite + 1))
+    linhas = db.session.execute(consulta).all()
+
+    proximo = None
+    if len(linhas) > limite:
+        linhas = linhas[:limite]
+        proximo = linhas[-1].id
+
+    return jsonify({
+        'dados': serializador.de_linhas(linhas),
+        'next_cursor': proximo
+    }), 200
+
+
+# Quantidade máxima de ids aceitos por consulta de existência em lote
+LIMITE_EXISTENCIA = 10000
+# Ids por cláusula IN, abaixo do limite de parâmetros do SQLite
+TAMANHO_LOTE_IN = 500
+
+
+def _verificar_existencia(model):
+    """
+    Separa os ids do corpo {"ids": [...]} entre existentes e ausentes,
+    com uma consulta WHERE id IN (...) por lote.
+    """
+    dados = request.get_json(silent=True)
+    recebidos = dados.get('ids') if isinstance(dados, dict) else None
+    # bool é subclasse de int, mas true/false não são ids
+    if not isinstance(recebidos, list) or not all(isinstance(i, int) and not isinstance(i, bool) for i in recebidos):
+        return jsonify({'erro': 'Informe "ids" como uma lista de números inteiros.'}), 400
+    ids = set(recebidos)
+    if len(ids) > LIMITE_EXISTENCIA:
+        return jsonify({'erro': f'No máximo {LIMITE_EXISTENCIA} ids por requisição.'}), 400
+
+    lista = sorted(ids)
+    encontrados = set()
+    for i in range(0, len(lista), TAMANHO_LOTE_IN):
+        lote = lista[i:i + TAMANHO_LOTE_IN]
+        encontrados.update(db.session.execute(db.select(model.id).where(model.id.in_(lote))).scalars())
+
+    return jsonify({
+        'encontrados': sorted(encontrados),
+        'ausentes': sorted(ids - encontrados)
+    }), 200
+
+
+# Campos que Reservas e Atividades-Notas mantêm na réplica local, por recurso
+SERIALIZADORES_REPLICACAO = {
+    'alunos': SERIALIZADOR_ALUNO.subconjunto(('id', 'turma_id')),
+    'turmas': SERIALIZADOR_TURMA.subconjunto(('id', 'professor_id', 'ativo')),
+    'professores': SERIALIZADOR_PROFESSOR.subconjunto(('id',)),
+}
+
+
+def _limite_feed():
+    """Mudanças criadas depois deste instante ainda não entram no cursor do feed."""
+    return datetime.utcnow() - timedelta(seconds=current_app.config.get('FEED_JANELA', 0))
+
+
+def _cursor_seguro(mudancas, desde):
+    """
+    Cursor do feed para `mudancas` (em ordem de id), sem passar da primeira
+    criada nos últimos FEED_JANELA segundos.
+
+    O id de Mudanca é reservado no INSERT, não no commit: com vários workers
+    (PostgreSQL), a transação com o id N-1 pode confirmar depois da que tem o
+    N. As mudanças recentes são enviadas, mas o cursor fica antes delas, e a
+    consulta seguinte as lê de novo junto com as que confirmarem atrasadas.
+    Reler é inofensivo: os consumidores invalidam o cache ou gravam o estado
+    atual do registro. Só uma transação mais longa que a janela perde a
+    mudança.
+    """
+    limite = _limite_feed()
+    cursor = desde
+    for m in mudancas:
+        if m.criado_em > limite:
+            break
+        cursor = m.id
+    return cursor
+
+
+def _estado_atual(mudancas):
+    """
+    Estado atual (campos de replicação) de cada registro em `mudancas`,
+    por (recurso, id). Registros removidos ficam de fora.
+    """
+    ids = {}
+    for m in mudancas:
+        ids.setdefault(m.recurso, set()).add(m.recurso_id)
+    atuais = {}
+    for recurso, conjunto in ids.items():
+        serializador = SERIALIZADORES_REPLICACAO[recurso]
+        lista = sorted(conjunto)
+        for i in range(0, len(lista), TAMANHO_LOTE_IN):
+            for linha in serializador.listar(serializador.model.id.in_(lista[i:i + TAMANHO_LOTE_IN])):
+                atuais[(recurso, linha['id'])] = linha
+    return atuais
+
 
 def setup_routes(app):
 
     # ------------------ CRUD Professores ------------------
 
     @app.route('/professores', methods=['GET'])
+    @cache_http('professor')
     def list_professores():
         """
         Lista os professores
@@ -17,20 +196,33 @@ def setup_routes(app):
         tags:
           - Professores
         summary: Lista todos os professores
+        parameters:
+          - in: query
+            name: limit
+            schema: { type: integer }
+            required: false
+            description: Quantidade máxima de registros por página (ativa a paginação)
+          - in: query
+            name: cursor
+            schema: { type: integer }
+            required: false
+            description: Valor de next_cursor retornado pela página anterior
+          - in: query
+            name: fields
+            schema: { type: string }
+            required: false
+            description: Campos a retornar, separados por vírgula (ex. id,nome)
         responses:
           200:
             description: Lista de professores
         """
-        professores = Professor.query.all()
-        return jsonify([{
-            'id': p.id,
-            'nome': p.nome,
-            'idade': p.idade,
-            'materia': p.materia,
-            'observacoes': p.observacoes
-        } for p in professores])
+        if _pediu_paginacao():
+            return _listar_paginado(SERIALIZADOR_PROFESSOR)
+
+        return jsonify(SERIALIZADOR_PROFESSOR.listar())
 
     @app.route('/professores/<int:id>', methods=['GET'])
+    @cache_http('professor')
     def get_professor(id):
         """
         Obtém um Professor pelo ID
@@ -56,14 +248,34 @@ def setup_routes(app):
         if not prof:
             return jsonify({'erro': 'Professor não encontrado.'}), 404
         
-        return jsonify({
-            'id': prof.id,
-            'nome': prof.nome,
-            'idade': prof.idade,
-            'materia': prof.materia,
-            'observacoes': prof.observacoes
-            }), 200
+        return jsonify(prof.to_dict()), 200
     
+    @app.route('/professores/exists', methods=['POST'])
+    def exists_professores():
+        """
+        Verifica a existência de vários professores
+        ---
+        tags:
+          - Professores
+        summary: Verifica em lote quais ids de professores existem
+        requestBody:
+          required: true
+          content:
+            application/json:
+              schema:
+                type: object
+                properties:
+                  ids:
+                    type: array
+                    items: { type: integer }
+        responses:
+          200:
+            description: Ids encontrados e ausentes
+          400:
+            description: Dados inválidos
+        """
+        return _verificar_existencia(Professor)
+
     @app.route('/professores', methods=['POST'])
     def create_professor():
         """
@@ -159,16 +371,21 @@ def setup_routes(app):
             description: Professor deletado
           404:
             description: Professor não encontrado
+          409:
+            description: Professor possui turmas vinculadas
         """
         professor = Professor.query.get_or_404(id)
         db.session.delete(professor)
-        db.session.commit()
+        erro = _commit('Professor possui turmas vinculadas e não pode ser removido.')
+        if erro:
+            return erro
         return jsonify({'message': 'Professor deletado'})
 
 
     # ------------------ CRUD Turmas ------------------
 
     @app.route('/turmas', methods=['GET'])
+    @cache_http('turma', 'aluno')
     def list_turmas():
         """
         Lista todas as turmas
@@ -176,19 +393,51 @@ def setup_routes(app):
         tags:
           - Turmas
         summary: Lista todas as turmas
+        parameters:
+          - in: query
+            name: limit
+            schema: { type: integer }
+            required: false
+            description: Quantidade máxima de registros por página (ativa a paginação)
+          - in: query
+            name: cursor
+            schema: { type: integer }
+            required: false
+            description: Valor de next_cursor retornado pela página anterior
+          - in: query
+            name: fields
+            schema: { type: string }
+            required: false
+            description: Campos a retornar, separados por vírgula (ex. id,nome)
+          - in: query
+            name: expand
+            schema: { type: string }
+            required: false
+            description: Inclui os alunos de cada turma (expand=alunos); não se aplica à paginação
         responses:
           200:
             description: Lista de turmas
+          400:
+            description: Valor de expand inválido
         """
-        turmas = Turma.query.all()
-        return jsonify([{
-            'id': t.id,
-            'descricao': t.descricao,
-            'professor_id': t.professor_id,
-            'ativo': t.ativo
-        } for t in turmas])
+        if _pediu_paginacao():
+            return _listar_paginado(SERIALIZADOR_TURMA)
+
+        try:
+            expandir = expansoes(EXPANSOES_TURMA)
+        except FiltroInvalido as e:
+            return jsonify({'erro': str(e)}), 400
+
+        if 'alunos' not in expandir:
+            return jsonify(SERIALIZADOR_TURMA.listar())
+
+        # Uma única consulta extra para todos os alunos, qualquer que seja o número de turmas
+        # (o selectinload divide o IN em lotes de 500 e faria uma consulta por lote)
+        turmas = Turma.query.options(subqueryload(Turma.alunos)).all()
+        return jsonify([_turma_dict(t, expandir) for t in turmas])
     
     @app.route('/turmas/<int:id>', methods=['GET'])
+    @cache_http('turma', 'aluno')
     def get_turma(id):
       """
       Busca uma turma pelo ID
@@ -202,24 +451,58 @@ def setup_routes(app):
           type: integer
           required: true
           description: ID da turma
+        - in: query
+          name: expand
+          schema: { type: string }
+          required: false
+          description: Inclui os alunos da turma (expand=alunos)
       responses:
         200:
           description: Detalhes da turma
+        400:
+          description: Valor de expand inválido
         404:
           description: Turma não encontrada
       """
-      turma = Turma.query.get(id)
+      try:
+        expandir = expansoes(EXPANSOES_TURMA)
+      except FiltroInvalido as e:
+        return jsonify({'erro': str(e)}), 400
+
+      opcoes = [selectinload(Turma.alunos)] if 'alunos' in expandir else []
+      turma = db.session.get(Turma, id, options=opcoes)
       if not turma:
         return jsonify({'mensagem': 'Turma não encontrada'}), 404
 
-      return jsonify({
-          'id': turma.id,
-          'descricao': turma.descricao,
-          'professor_id': turma.professor_id,
-          'ativo': turma.ativo
-      }), 200
+      return jsonify(_turma_dict(turma, expandir)), 200
 
 
+    @app.route('/turmas/exists', methods=['POST'])
+    def exists_turmas():
+        """
+        Verifica a existência de vários turmas
+        ---
+        tags:
+          - Turmas
+        summary: Verifica em lote quais ids de turmas existem
+        requestBody:
+          required: true
+          content:
+            application/json:
+              schema:
+                type: object
+                properties:
+                  ids:
+                    type: array
+                    items: { type: integer }
+        responses:
+          200:
+            description: Ids encontrados e ausentes
+          400:
+            description: Dados inválidos
+        """
+        return _verificar_existencia(Turma)
+
     @app.route('/turmas', methods=['POST'])
     def create_turma():
         """
@@ -251,7 +534,9 @@ def setup_routes(app):
             ativo=data.get('ativo', True)
         )
         db.session.add(turma)
-        db.session.commit()
+        erro = _commit(f'Professor com ID {turma.professor_id} não encontrado.', 400)
+        if erro:
+            return erro
         return jsonify({'message': 'Turma criada', 'id': turma.id}), 201
 
     @app.route('/turmas/<int:id>', methods=['PUT'])
@@ -280,6 +565,8 @@ def setup_routes(app):
         responses:
           200:
             description: Turma atualizada
+          400:
+            description: Professor inexistente
           404:
             description: Turma não encontrada
         """
@@ -288,7 +575,9 @@ def setup_routes(app):
         turma.descricao = data['descricao']
         turma.professor_id = int(data['professor_id'])
         turma.ativo = data.get('ativo', True)
-        db.session.commit()
+        erro = _commit(f'Professor com ID {turma.professor_id} não encontrado.', 400)
+        if erro:
+            return erro
         return jsonify({'message': 'Turma atualizada'})
 
     @app.route('/turmas/<int:id>', methods=['DELETE'])
@@ -309,16 +598,21 @@ def setup_routes(app):
             description: Turma deletada
           404:
             description: Turma não encontrada
+          409:
+            description: Turma possui alunos vinculados
         """
         turma = Turma.query.get_or_404(id)
         db.session.delete(turma)
-        db.session.commit()
+        erro = _commit('Turma possui alunos vinculados e não pode ser removida.')
+        if erro:
+            return erro
         return jsonify({'message': 'Turma deletada'})
 
 
     # ------------------ CRUD Alunos ------------------
 
     @app.route('/alunos', methods=['GET'])
+    @cache_http('aluno')
     def list_alunos():
         """
         Lista todos os alunos
@@ -326,23 +620,53 @@ def setup_routes(app):
         tags:
           - Alunos
         summary: Lista todos os alunos
+        parameters:
+          - in: query
+            name: limit
+            schema: { type: integer }
+            required: false
+            description: Quantidade máxima de registros por página (ativa a paginação)
+          - in: query
+            name: cursor
+            schema: { type: integer }
+            required: false
+            description: Valor de next_cursor retornado pela página anterior
+          - in: query
+            name: fields
+            schema: { type: string }
+            required: false
+            description: Campos a retornar, separados por vírgula (ex. id,nome)
+          - in: query
+            name: stream
+            schema: { type: boolean }
+            required: false
+            description: Transmite a lista em NDJSON (equivale a Accept application/x-ndjson)
+          - in: query
+            name: turma_id
+            schema: { type: integer }
+            required: false
+            description: Retorna apenas os alunos da turma
         responses:
           200:
             description: Lista de alunos
+          400:
+            description: Parâmetro de filtro inválido
         """
-        alunos = Aluno.query.all()
-        return jsonify([{
-            'id': a.id,
-            'nome': a.nome,
-            'idade': a.idade,
-            'turma_id': a.turma_id,
-            'data_nascimento': a.data_nascimento.isoformat(),
-            'nota_primeiro_semestre': a.nota_primeiro_semestre,
-            'nota_segundo_semestre': a.nota_segundo_semestre,
-            'media_final': a.media_final
-        } for a in alunos])
+        try:
+            condicoes = condicoes_igualdade(Aluno, ('turma_id',))
+        except FiltroInvalido as e:
+            return jsonify({'erro': str(e)}), 400
+
+        if quer_ndjson():
+            return resposta_ndjson(
+                SERIALIZADOR_ALUNO.select().where(*condicoes).order_by(Aluno.id), SERIALIZADOR_ALUNO)
+        if _pediu_paginacao():
+            return _listar_paginado(SERIALIZADOR_ALUNO, condicoes)
+
+        return jsonify(SERIALIZADOR_ALUNO.listar(*condicoes))
 
     @app.route('/alunos/<int:id>', methods=['GET'])
+    @cache_http('aluno')
     def get_aluno(id):
         """
         Obtém um Aluno pelo ID
@@ -368,16 +692,33 @@ def setup_routes(app):
         if not aluno:
           return jsonify({'erro': 'Aluno não encontrado!'}), 404
         
-        return jsonify({
-            'id': aluno.id,
-            'nome': aluno.nome,
-            'idade': aluno.idade,
-            'turma_id': aluno.turma_id,
-            'data_nascimento': aluno.data_nascimento.isoformat(),
-            'nota_primeiro_semestre': aluno.nota_primeiro_semestre,
-            'nota_segundo_semestre': aluno.nota_segundo_semestre,
-            'media_final': aluno.media_final
-        }), 200
+        return jsonify(aluno.to_dict()), 200
+
+    @app.route('/alunos/exists', methods=['POST'])
+    def exists_alunos():
+        """
+        Verifica a existência de vários alunos
+        ---
+        tags:
+          - Alunos
+        summary: Verifica em lote quais ids de alunos existem
+        requestBody:
+          required: true
+          content:
+            application/json:
+              schema:
+                type: object
+                properties:
+                  ids:
+                    type: array
+                    items: { type: integer }
+        responses:
+          200:
+            description: Ids encontrados e ausentes
+          400:
+            description: Dados inválidos
+        """
+        return _verificar_existencia(Aluno)
 
     @app.route('/alunos', methods=['POST'])
     def create_aluno():
@@ -418,7 +759,9 @@ def setup_routes(app):
             media_final=float(data['media_final'])
         )
         db.session.add(aluno)
-        db.session.commit()
+        erro = _commit(f'Turma com ID {aluno.turma_id} não encontrada.', 400)
+        if erro:
+            return erro
         return jsonify({'message': 'Aluno criado', 'id': aluno.id}), 201
 
     @app.route('/alunos/<int:id>', methods=['PUT'])
@@ -451,6 +794,8 @@ def setup_routes(app):
         responses:
           200:
             description: Aluno atualizado
+          400:
+            description: Turma inexistente
           404:
             description: Aluno não encontrado
         """
@@ -463,7 +808,9 @@ def setup_routes(app):
         aluno.nota_primeiro_semestre = float(data['nota_primeiro_semestre'])
         aluno.nota_segundo_semestre = float(data['nota_segundo_semestre'])
         aluno.media_final = float(data['media_final'])
-        db.session.commit()
+        erro = _commit(f'Turma com ID {aluno.turma_id} não encontrada.', 400)
+        if erro:
+            return erro
         return jsonify({'message': 'Aluno atualizado'})
 
     @app.route('/alunos/<int:id>', methods=['DELETE'])
@@ -493,3 +840,113 @@ def setup_routes(app):
         db.session.delete(aluno)
         db.session.commit()
         return jsonify({'message': 'Aluno deletado'}), 201
+
+
+    # ------------------ Feed de mudanças ------------------
+
+    @app.route('/mudancas', methods=['GET'])
+    def list_mudancas():
+        """
+        Lista as mudanças em alunos, turmas e professores
+        ---
+        tags:
+          - Mudanças
+        summary: Feed de alterações usado pelos outros serviços para invalidar caches
+        parameters:
+          - in: query
+            name: desde
+            schema: { type: integer }
+            required: false
+            description: Retorna as mudanças com sequência maior que este valor. Se omitido, retorna apenas o cursor atual
+          - in: query
+            name: limit
+            schema: { type: integer }
+            required: false
+            description: Quantidade máxima de mudanças retornadas
+        responses:
+          200:
+            description: Mudanças e o cursor para a próxima consulta (o cursor não passa das mudanças dos últimos FEED_JANELA segundos, que voltam na consulta seguinte)
+        """
+        if 'desde' not in request.args:
+            # Cursor atual: a última mudança antes da primeira recente (ver _cursor_seguro)
+            recente = (db.session.query(db.func.min(Mudanca.id))
+                       .filter(Mudanca.criado_em > _limite_feed()).scalar())
+            anteriores = db.session.query(db.func.max(Mudanca.id))
+            if recente is not None:
+                anteriores = anteriores.filter(Mudanca.id < recente)
+            cursor = anteriores.scalar() or 0
+            return jsonify({'mudancas': [], 'cursor': cursor}), 200
+
+        try:
+            desde = int(request.args['desde'])
+            limite = max(1, min(int(request.args.get('limit', LIMITE_MAXIMO)), LIMITE_MAXIMO))
+        except ValueError:
+            return jsonify({'erro': 'Os parâmetros desde e limit devem ser números inteiros.'}), 400
+
+        mudancas = (Mudanca.query
+                    .filter(Mudanca.id > desde)
+                    .order_by(Mudanca.id)
+                    .limit(limite)
+                    .all())
+        return jsonify({
+            'mudancas': [{
+                'seq': m.id,
+                'recurso': m.recurso,
+                'id': m.recurso_id,
+                'operacao': m.operacao
+            } for m in mudancas],
+            'cursor': _cursor_seguro(mudancas, desde)
+        }), 200
+
+    @app.route('/replicacao', methods=['GET'])
+    def list_replicacao():
+        """
+        Mudanças com o estado atual de cada registro, para as réplicas locais
+        ---
+        tags:
+          - Mudanças
+        summary: Feed incremental usado por Reservas e Atividades-Notas para manter a réplica de alunos, turmas e professores
+        parameters:
+          - in: query
+            name: desde
+            schema: { type: integer }
+            required: false
+            description: Cursor da última sincronização (padrão 0)
+          - in: query
+            name: limit
+            schema: { type: integer }
+            required: false
+            description: Quantidade máxima de mudanças lidas do feed
+        responses:
+          200:
+            description: Registros alterados (dados nulos quando removidos), o cursor e a última sequência do feed; como em /mudancas, o cursor fica antes das mudanças recentes
+        """
+        try:
+            desde = int(request.args.get('desde', 0))
+            limite = max(1, min(int(request.args.get('limit', LIMITE_MAXIMO)), LIMITE_MAXIMO))
+        except ValueError:
+            return jsonify({'erro': 'Os parâmetros desde e limit devem ser números inteiros.'}), 400
+
+        mudancas = db.session.execute(
+            db.select(Mudanca.id, Mudanca.recurso, Mudanca.recurso_id, Mudanca.criado_em)
+            .where(Mudanca.id > desde)
+            .order_by(Mudanca.id)
+            .limit(limite)
+        ).all()
+        ultimo = db.session.query(db.func.max(Mudanca.id)).scalar() or 0
+
+        # Vários eventos do mesmo registro viram um só: o estado enviado é o atual
+        sequencias = {}
+        for m in mudancas:
+            sequencias[(m.recurso, m.recurso_id)] = m.id
+        atuais = _estado_atual(mudancas)
+        return jsonify({
+            'itens': [{
+                'seq': seq,
+                'recurso': recurso,
+                'id': id,
+                'dados': atuais.get((recurso, id))
+            } for (recurso, id), seq in sorted(sequencias.items(), key=lambda item: item[1])],
+            'cursor': _cursor_seguro(mudancas, desde),
+            'ultimo': ultimo
+        }), 200
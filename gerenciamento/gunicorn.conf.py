@@ -0,0 +1,18 @@
+import multiprocessing
+import os
+
+# Configuração do modo de produção (SERVIDOR=gunicorn). Cada worker é um
+# processo com a sua própria aplicação; GUNICORN_THREADS > 1 usa o worker
+# gthread, que atende várias requisições por processo.
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+workers = int(os.getenv("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+worker_class = "gthread" if threads > 1 else "sync"
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+# Recicla os workers periodicamente para limitar vazamentos de memória
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "10000"))
+max_requests_jitter = max_requests // 10
+accesslog = "-"
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOGLEVEL", "info")
@@ -2,5 +2,7 @@ from .database import db
 from .aluno_model import Aluno
 from .professor_model import Professor
 from .turma_model import Turma
+from .mudanca_model import Mudanca
+from .versao_model import VersaoTabela
 
-__all__ = ['Aluno', 'Professor', 'Turma', 'db']
+__all__ = ['Aluno', 'Mudanca', 'Professor', 'Turma', 'VersaoTabela', 'db']
@@ -1,4 +1,5 @@
 from .database import db
+from .serializacao import Serializador
 
 class Aluno(db.Model):
     __tablename__ = 'aluno'
@@ -6,8 +7,15 @@ class Aluno(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     nome = db.Column(db.String(100), nullable=False)
     idade = db.Column(db.Integer, nullable=False)
-    turma_id = db.Column(db.Integer, db.ForeignKey('turma.id'), nullable=False)
+    turma_id = db.Column(db.Integer, db.ForeignKey('turma.id'), nullable=False, index=True)
     data_nascimento = db.Column(db.Date, nullable=False)
     nota_primeiro_semestre = db.Column(db.Float, nullable=True)
     nota_segundo_semestre = db.Column(db.Float, nullable=True)
-    media_final = db.Column(db.Float, nullable=True)
\ No newline at end of file
+    media_final = db.Column(db.Float, nullable=True)
+
+    def to_dict(self):
+        return SERIALIZADOR_ALUNO.de_objeto(self)
+
+
+SERIALIZADOR_ALUNO = Serializador(Aluno, ('id', 'nome', 'idade', 'turma_id', 'data_nascimento',
+                                        'nota_primeiro_semestre', 'nota_segundo_semestre', 'media_final'))
@@ -1,3 +1,118 @@
+import logging
+import time
+from collections import Counter
+from flask import g, has_request_context, request
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
 
 db = SQLAlchemy()
+logger = logging.getLogger(__name__)
+
+
+def criar_indices():
+    """
+    Cria os índices declarados nos modelos que ainda não existem no banco.
+
+    O db.create_all() não altera tabelas já existentes, então bancos criados
+    antes da declaração dos índices são atualizados por esta função.
+    """
+    for tabela in db.metadata.sorted_tables:
+        for indice in tabela.indexes:
+            indice.create(bind=db.engine, checkfirst=True)
+
+
+# PRAGMAs aplicados a cada conexão SQLite, por perfil (config SQLITE_PERFIL).
+# No perfil "otimizado", o WAL deixa leitores e o escritor trabalharem em
+# paralelo, synchronous=NORMAL é seguro com WAL e busy_timeout faz os
+# escritores esperarem o lock em vez de falhar com "database is locked".
+PERFIS_SQLITE = {
+    'padrao': {},
+    'otimizado': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,
+        'cache_size': -20000,
+        'mmap_size': 268435456,
+        'temp_store': 'MEMORY',
+        'foreign_keys': 'ON',
+    },
+}
+
+
+def configurar_sqlite(app):
+    """
+    Registra no engine um evento de conexão que aplica os PRAGMAs do perfil
+    SQLITE_PERFIL, sobrescritos pelos de SQLITE_PRAGMAS. Não faz nada se o
+    banco não for SQLite.
+    """
+    pragmas = dict(PERFIS_SQLITE[app.config.get('SQLITE_PERFIL', 'otimizado')])
+    pragmas.update(app.config.get('SQLITE_PRAGMAS', {}))
+    with app.app_context():
+        engine = db.engine
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def aplicar_pragmas(conexao_dbapi, registro):
+        cursor = conexao_dbapi.cursor()
+        for nome, valor in pragmas.items():
+            cursor.execute(f'PRAGMA {nome}={valor}')
+        cursor.close()
+
+
+def configurar_perfil_sql(app):
+    """
+    Registra no engine o log de consultas lentas e o perfil de SQL por
+    requisição.
+
+    Comandos acima de SQL_LENTO_MS são sempre registrados no log. Com
+    SQL_PERFIL (ou o cabeçalho X-Debug-SQL: 1, se SQL_PERFIL_HEADER), cada
+    comando da requisição é guardado com tempo e linhas afetadas, e a
+    resposta leva o cabeçalho Server-Timing com o total gasto no banco.
+    """
+    limite = app.config.get('SQL_LENTO_MS', 0) / 1000
+    perfil_sempre = app.config.get('SQL_PERFIL', False)
+    perfil_header = app.config.get('SQL_PERFIL_HEADER', False)
+    if not (limite or perfil_sempre or perfil_header):
+        return
+    with app.app_context():
+        engine = db.engine
+
+    @app.before_request
+    def iniciar_perfil_sql():
+        if perfil_sempre or (perfil_header and request.headers.get('X-Debug-SQL') == '1'):
+            g.perfil_sql = (time.perf_counter(), [])
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def iniciar_comando(conexao, cursor, sql, parametros, contexto, executemany):
+        contexto._perfil_inicio = time.perf_counter()
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def registrar_comando(conexao, cursor, sql, parametros, contexto, executemany):
+        duracao = time.perf_counter() - contexto._perfil_inicio
+        # rowcount só é conhecido para INSERT/UPDATE/DELETE (-1 em SELECT)
+        linhas = cursor.rowcount if cursor.rowcount >= 0 else None
+        if limite and duracao >= limite:
+            logger.warning('Consulta lenta (%.1f ms, linhas: %s): %s', duracao * 1000, linhas, ' '.join(sql.split()))
+        if has_request_context() and 'perfil_sql' in g:
+            g.perfil_sql[1].append((sql, duracao, linhas))
+
+    @app.after_request
+    def encerrar_perfil_sql(resposta):
+        if 'perfil_sql' not in g:
+            return resposta
+        inicio, comandos = g.pop('perfil_sql')
+        total_db = sum(duracao for _, duracao, _ in comandos)
+        resposta.headers.add('Server-Timing', f'db;dur={total_db * 1000:.2f};desc="{len(comandos)} comandos SQL"')
+        resposta.headers.add('Server-Timing', f'app;dur={(time.perf_counter() - inicio) * 1000:.2f}')
+
+        linhas_log = [f'{request.method} {request.path}: {len(comandos)} comandos SQL em {total_db * 1000:.1f} ms']
+        linhas_log += [f'  {duracao * 1000:8.2f} ms  linhas: {linhas}  {" ".join(sql.split())}'
+                       for sql, duracao, linhas in comandos]
+        # O mesmo SQL repetido muitas vezes na requisição costuma ser N+1
+        for sql, vezes in Counter(sql for sql, _, _ in comandos).most_common():
+            if vezes < 3:
+                break
+            linhas_log.append(f'  possível N+1: executado {vezes} vezes: {" ".join(sql.split())}')
+        logger.warning('\n'.join(linhas_log))
+        return resposta
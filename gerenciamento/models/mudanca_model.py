@@ -0,0 +1,35 @@
+from datetime import datetime
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from .database import db
+
+# Nome do recurso (rota) de cada tabela acompanhada pelo feed de mudanças
+RECURSOS = {
+    'aluno': 'alunos',
+    'turma': 'turmas',
+    'professor': 'professores',
+}
+
+
+class Mudanca(db.Model):
+    __tablename__ = 'mudanca'
+
+    id = db.Column(db.Integer, primary_key=True)
+    recurso = db.Column(db.String(20), nullable=False)
+    recurso_id = db.Column(db.Integer, nullable=False)
+    operacao = db.Column(db.String(10), nullable=False)
+    criado_em = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+
+@event.listens_for(Session, 'after_flush')
+def registrar_mudancas(session, flush_context):
+    """Grava no feed, na mesma transação, cada aluno/turma/professor alterado."""
+    linhas = []
+    for operacao, objetos in (('criado', session.new), ('atualizado', session.dirty), ('removido', session.deleted)):
+        for obj in objetos:
+            recurso = RECURSOS.get(getattr(obj, '__tablename__', None))
+            if recurso and (operacao != 'atualizado' or session.is_modified(obj)):
+                linhas.append({'recurso': recurso, 'recurso_id': obj.id, 'operacao': operacao,
+                               'criado_em': datetime.utcnow()})
+    if linhas:
+        session.connection().execute(Mudanca.__table__.insert(), linhas)
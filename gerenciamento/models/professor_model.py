@@ -1,4 +1,5 @@
 from .database import db
+from .serializacao import Serializador
 
 class Professor(db.Model):
     __tablename__ = 'professor'
@@ -9,4 +10,10 @@ class Professor(db.Model):
     materia = db.Column(db.String(100), nullable=False)
     observacoes = db.Column(db.Text, nullable=True)
 
-    turmas = db.relationship('Turma', backref='professor', lazy=True)
\ No newline at end of file
+    turmas = db.relationship('Turma', backref='professor', lazy=True)
+
+    def to_dict(self):
+        return SERIALIZADOR_PROFESSOR.de_objeto(self)
+
+
+SERIALIZADOR_PROFESSOR = Serializador(Professor, ('id', 'nome', 'idade', 'materia', 'observacoes'))
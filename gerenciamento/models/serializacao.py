@@ -0,0 +1,53 @@
+from operator import attrgetter
+from sqlalchemy import Date, DateTime, select
+
+
+class Serializador:
+    """
+    Converte instâncias e linhas (Row) de um modelo em dicionários.
+
+    A lista de colunas, o leitor de atributos e quais campos são datas são
+    calculados uma única vez, então converter uma linha é só um zip mais a
+    formatação ISO das datas. As listagens usam select() + de_linha() para
+    não hidratar objetos ORM.
+    """
+
+    def __init__(self, model, campos):
+        self.model = model
+        self.campos = tuple(campos)
+        self.colunas = tuple(getattr(model, c) for c in self.campos)
+        self._datas = tuple(c for c in self.campos
+                            if isinstance(model.__table__.c[c].type, (Date, DateTime)))
+        ler = attrgetter(*self.campos)
+        self._ler = ler if len(self.campos) > 1 else (lambda obj: (ler(obj),))
+        self._subconjuntos = {}
+
+    def subconjunto(self, campos):
+        """Serializador só com `campos` (ex.: ?fields=), criado uma vez por combinação."""
+        campos = tuple(campos)
+        if campos == self.campos:
+            return self
+        if campos not in self._subconjuntos:
+            self._subconjuntos[campos] = Serializador(self.model, campos)
+        return self._subconjuntos[campos]
+
+    def select(self):
+        return select(*self.colunas)
+
+    def de_linha(self, linha):
+        dados = dict(zip(self.campos, linha))
+        for campo in self._datas:
+            if dados[campo] is not None:
+                dados[campo] = dados[campo].isoformat()
+        return dados
+
+    def de_linhas(self, linhas):
+        return [self.de_linha(linha) for linha in linhas]
+
+    def de_objeto(self, obj):
+        return self.de_linha(self._ler(obj))
+
+    def listar(self, *condicoes):
+        """Executa SELECT das colunas com `condicoes` e devolve a lista de dicionários."""
+        # model.query.session é a sessão do Flask-SQLAlchemy da requisição
+        return self.de_linhas(self.model.query.session.execute(self.select().where(*condicoes)))
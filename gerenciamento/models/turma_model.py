@@ -1,11 +1,18 @@
 from .database import db
+from .serializacao import Serializador
 
 class Turma(db.Model):
     __tablename__ = 'turma'
     
     id = db.Column(db.Integer, primary_key=True)
     descricao = db.Column(db.String(100), nullable=False)
-    professor_id = db.Column(db.Integer, db.ForeignKey('professor.id'), nullable=False)
+    professor_id = db.Column(db.Integer, db.ForeignKey('professor.id'), nullable=False, index=True)
     ativo = db.Column(db.Boolean, default=True, nullable=False)
 
-    alunos = db.relationship('Aluno', backref='turma', lazy=True)
\ No newline at end of file
+    alunos = db.relationship('Aluno', backref='turma', lazy=True)
+
+    def to_dict(self):
+        return SERIALIZADOR_TURMA.de_objeto(self)
+
+
+SERIALIZADOR_TURMA = Serializador(Turma, ('id', 'descricao', 'professor_id', 'ativo'))
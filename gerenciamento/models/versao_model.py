@@ -0,0 +1,85 @@
+from datetime import datetime
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from .database import db
+
+
+class VersaoTabela(db.Model):
+    """Versão de cada tabela, incrementada após cada commit que a altera (usada nas ETags)."""
+    __tablename__ = 'versao_tabela'
+
+    tabela = db.Column(db.String(50), primary_key=True)
+    versao = db.Column(db.Integer, nullable=False, default=0)
+    atualizado_em = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+
+def _incrementar(conexao, tabelas):
+    t = VersaoTabela.__table__
+    agora = datetime.utcnow()
+    for nome in sorted(tabelas):
+        resultado = conexao.execute(t.update().where(t.c.tabela == nome)
+                                    .values(versao=t.c.versao + 1, atualizado_em=agora))
+        if not resultado.rowcount:
+            conexao.execute(t.insert().values(tabela=nome, versao=1, atualizado_em=agora))
+
+
+def _pendentes(session):
+    return session.info.setdefault('versoes_pendentes', set())
+
+
+@event.listens_for(Session, 'after_flush')
+def registrar_versoes(session, flush_context):
+    """Anota as tabelas alteradas pelo flush; as versões sobem depois do commit."""
+    tabelas = {obj.__tablename__ for obj in (*session.new, *session.deleted)}
+    tabelas.update(obj.__tablename__ for obj in session.dirty if session.is_modified(obj))
+    tabelas.discard(VersaoTabela.__tablename__)
+    _pendentes(session).update(tabelas)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def registrar_versoes_em_lote(estado):
+    """INSERT/UPDATE/DELETE em lote (db.insert(...) etc.) não passam pelo flush."""
+    if estado.is_insert or estado.is_update or estado.is_delete:
+        tabela = estado.statement.table.name
+        if tabela != VersaoTabela.__tablename__:
+            _pendentes(estado.session).add(tabela)
+
+
+@event.listens_for(Session, 'after_commit')
+def incrementar_versoes(session):
+    """
+    Incrementa as versões das tabelas alteradas numa transação curta, depois
+    do commit. Feito dentro da transação de escrita, o UPDATE seguraria o
+    lock da linha em versao_tabela até o commit e serializaria todos os
+    escritores da tabela (no PostgreSQL, um /notas/batch inteiro). Entre o
+    commit e o incremento, uma leitura ainda vê a versão anterior; a
+    seguinte já vê a nova.
+    """
+    tabelas = session.info.pop('versoes_pendentes', None)
+    if tabelas:
+        with session.get_bind().begin() as conexao:
+            _incrementar(conexao, tabelas)
+
+
+@event.listens_for(Session, 'after_rollback')
+def descartar_versoes(session):
+    session.info.pop('versoes_pendentes', None)
+
+
+def criar_versoes():
+    """Cria a linha de versão das tabelas que ainda não têm uma."""
+    t = VersaoTabela.__table__
+    existentes = set(db.session.execute(db.select(t.c.tabela)).scalars())
+    novas = [{'tabela': nome, 'versao': 0, 'atualizado_em': datetime.utcnow()}
+             for nome in db.metadata.tables if nome not in existentes and nome != t.name]
+    if novas:
+        db.session.execute(t.insert(), novas)
+    db.session.commit()
+
+
+def ler_versoes(tabelas):
+    """Versão e data da última alteração de cada tabela, em uma única consulta."""
+    t = VersaoTabela.__table__
+    linhas = db.session.execute(db.select(t.c.tabela, t.c.versao, t.c.atualizado_em)
+                                .where(t.c.tabela.in_(tabelas))).all()
+    return {linha.tabela: (linha.versao, linha.atualizado_em) for linha in linhas}
@@ -0,0 +1,61 @@
+"""Respostas condicionais de controller/cache_http.py."""
+import time
+from datetime import datetime, timedelta
+
+from models.database import db
+from models.versao_model import VersaoTabela
+
+
+def _criar_professor(cliente, nome):
+    resposta = cliente.post('/professores', json={'nome': nome, 'idade': 40, 'materia': 'Física'})
+    assert resposta.status_code == 201
+
+
+def _ler_depois_do_segundo_da_escrita(cliente):
+    """GET /professores depois que o segundo da última escrita passou (com Last-Modified)."""
+    time.sleep(1.1)
+    resposta = cliente.get('/professores')
+    assert 'Last-Modified' in resposta.headers
+    return resposta
+
+
+def test_ecoar_last_modified_responde_304(cliente):
+    _criar_professor(cliente, 'Ana')
+    primeira = _ler_depois_do_segundo_da_escrita(cliente)
+
+    resposta = cliente.get('/professores', headers={'If-Modified-Since': primeira.headers['Last-Modified']})
+    assert resposta.status_code == 304
+
+
+def test_escrita_depois_da_leitura_nao_responde_304(cliente):
+    _criar_professor(cliente, 'Ana')
+    primeira = _ler_depois_do_segundo_da_escrita(cliente)
+    _criar_professor(cliente, 'Bia')
+
+    resposta = cliente.get('/professores', headers={'If-Modified-Since': primeira.headers['Last-Modified']})
+    assert resposta.status_code == 200
+    assert len(resposta.get_json()) == 2
+
+
+def test_sem_last_modified_no_segundo_da_escrita(app, cliente):
+    _criar_professor(cliente, 'Ana')
+    with app.app_context():
+        # Escrita num segundo que ainda não terminou
+        db.session.get(VersaoTabela, 'professor').atualizado_em = datetime.utcnow() + timedelta(seconds=5)
+        db.session.commit()
+
+    resposta = cliente.get('/professores')
+    assert resposta.status_code == 200
+    assert 'Last-Modified' not in resposta.headers
+    assert 'ETag' in resposta.headers
+
+
+def test_com_if_none_match_so_a_etag_decide(cliente):
+    _criar_professor(cliente, 'Ana')
+    primeira = _ler_depois_do_segundo_da_escrita(cliente)
+    etag, last_modified = primeira.headers['ETag'], primeira.headers['Last-Modified']
+
+    assert cliente.get('/professores', headers={'If-None-Match': etag}).status_code == 304
+    _criar_professor(cliente, 'Bia')
+    resposta = cliente.get('/professores', headers={'If-None-Match': etag, 'If-Modified-Since': last_modified})
+    assert resposta.status_code == 200
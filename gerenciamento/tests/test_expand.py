@@ -0,0 +1,39 @@
+"""
+GET /turmas?expand=alunos deve fazer o mesmo número de consultas com
+poucas ou muitas turmas (sem N+1 nem lotes de IN).
+"""
+from datetime import date
+
+from models.database import db
+from models.aluno_model import Aluno
+from models.professor_model import Professor
+from models.turma_model import Turma
+
+
+def _popular(app, quantidade):
+    with app.app_context():
+        db.session.add(Professor(id=1, nome='Ana', idade=40, materia='Física'))
+        db.session.execute(db.insert(Turma), [{
+            'descricao': f'Turma {i}', 'professor_id': 1, 'ativo': True
+        } for i in range(quantidade)])
+        db.session.execute(db.insert(Aluno), [{
+            'nome': f'Aluno {i}-{j}', 'idade': 17, 'turma_id': i + 1, 'data_nascimento': date(2008, 3, 1),
+            'nota_primeiro_semestre': 7.0, 'nota_segundo_semestre': 8.0, 'media_final': 7.5
+        } for i in range(quantidade) for j in range(3)])
+        db.session.commit()
+
+
+def test_expand_alunos_consultas_constantes(criar_app, contar_consultas):
+    consultas = []
+    for quantidade in (10, 1000):
+        app = criar_app()
+        _popular(app, quantidade)
+        cliente = app.test_client()
+
+        def listar():
+            turmas = cliente.get('/turmas?expand=alunos').get_json()
+            assert len(turmas) == quantidade
+            assert all(len(t['alunos']) == 3 for t in turmas)
+
+        consultas.append(contar_consultas(app, listar))
+    assert consultas[0] == consultas[1]
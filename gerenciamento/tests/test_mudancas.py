@@ -0,0 +1,52 @@
+"""Cursor do feed de mudanças (/mudancas e /replicacao) com commits fora de ordem."""
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from models.database import db
+from models.mudanca_model import Mudanca
+
+JANELA = 0.5
+
+
+@pytest.fixture
+def app(criar_app):
+    return criar_app(FEED_JANELA=JANELA)
+
+
+def _registrar(app, id, idade=0.0):
+    """Mudança com sequência `id` confirmada agora, criada há `idade` segundos."""
+    with app.app_context():
+        db.session.execute(Mudanca.__table__.insert().values(
+            id=id, recurso='alunos', recurso_id=id, operacao='removido',
+            criado_em=datetime.utcnow() - timedelta(seconds=idade)))
+        db.session.commit()
+
+
+def _ler(cliente, desde):
+    corpo = cliente.get(f'/mudancas?desde={desde}').get_json()
+    return [m['seq'] for m in corpo['mudancas']], corpo['cursor']
+
+
+def test_cursor_nao_passa_das_mudancas_recentes(app, cliente):
+    _registrar(app, 1, idade=10)
+    _registrar(app, 3)
+    assert _ler(cliente, 0) == ([1, 3], 1)
+    assert cliente.get('/mudancas').get_json()['cursor'] == 1
+
+    # A transação com a sequência 2 confirma depois da 3
+    _registrar(app, 2)
+    assert _ler(cliente, 1) == ([2, 3], 1)
+
+    time.sleep(JANELA + 0.1)
+    assert _ler(cliente, 1) == ([2, 3], 3)
+    assert cliente.get('/mudancas').get_json()['cursor'] == 3
+
+
+def test_replicacao_usa_o_mesmo_cursor(app, cliente):
+    _registrar(app, 1, idade=10)
+    _registrar(app, 3)
+    corpo = cliente.get('/replicacao?desde=0').get_json()
+    assert [item['seq'] for item in corpo['itens']] == [1, 3]
+    assert (corpo['cursor'], corpo['ultimo']) == (1, 3)
@@ -0,0 +1,49 @@
+"""Versões de tabela (models/versao_model.py) usadas nas ETags."""
+from sqlalchemy import event
+
+from models.database import db
+from models.versao_model import ler_versoes
+
+
+def _versao(app, tabela):
+    with app.app_context():
+        return ler_versoes((tabela,))[tabela][0]
+
+
+def test_versao_sobe_depois_do_commit_em_outra_transacao(app, cliente):
+    comandos = []
+    with app.app_context():
+        engine = db.engine
+
+    def registrar(conexao, cursor, sql, *args):
+        comandos.append(sql.split()[0] + (' versao_tabela' if 'versao_tabela' in sql else ''))
+
+    def commit(conexao):
+        comandos.append('COMMIT')
+
+    event.listen(engine, 'before_cursor_execute', registrar)
+    event.listen(engine, 'commit', commit)
+    try:
+        antes = _versao(app, 'professor')
+        resposta = cliente.post('/professores', json={'nome': 'Ana', 'idade': 40, 'materia': 'Física'})
+        assert resposta.status_code == 201
+    finally:
+        event.remove(engine, 'before_cursor_execute', registrar)
+        event.remove(engine, 'commit', commit)
+
+    assert _versao(app, 'professor') == antes + 1
+    insercao = comandos.index('INSERT')
+    atualizacao = comandos.index('UPDATE versao_tabela')
+    # O INSERT é confirmado antes de a versão ser tocada
+    assert 'COMMIT' in comandos[insercao:atualizacao]
+
+
+def test_escrita_desfeita_nao_muda_a_versao(app, cliente):
+    professor = cliente.post('/professores', json={'nome': 'Ana', 'idade': 40, 'materia': 'Física'})
+    turma = cliente.post('/turmas', json={'descricao': 'A', 'professor_id': professor.get_json()['id']})
+    assert turma.status_code == 201
+    antes = _versao(app, 'professor')
+
+    # Professor com turma: o banco recusa e a transação é desfeita (409)
+    assert cliente.delete(f"/professores/{professor.get_json()['id']}").status_code == 409
+    assert _versao(app, 'professor') == antes
@@ -0,0 +1,4 @@
+-- Bancos de cada serviço no PostgreSQL compartilhado (perfil "postgres" do docker-compose)
+CREATE DATABASE gerenciamento;
+CREATE DATABASE reservas;
+CREATE DATABASE atividades_notas;
@@ -1,21 +1,75 @@
+import os
+import click
 from flask import Flask
-from flasgger import Swagger
-from models.reserva_model import db
+from flask.cli import with_appcontext
+from models.reserva_model import (db, criar_indices, migrar_datas, configurar_sqlite, configurar_perfil_sql,
+                                  ReservasConflitantes)
+from models.versao_model import criar_versoes
 from controller.routes import setup_routes  
+from controller.provedor_json import configurar_json
+from controller.compressao import configurar_compressao
+from metricas import configurar_metricas
+from clients import gerenciamento
 from config import Config
 
-app = Flask(__name__)
-app.config.from_object(Config) 
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///database.db'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-app.secret_key = 'projeto-API'
 
-swagger = Swagger(app)
-db.init_app(app)
-setup_routes(app)
-
-with app.app_context():
+def criar_schema():
+    """
+    Cria as tabelas, os índices e as linhas de versão que ainda não existem no
+    banco, depois de converter as datas antigas. Retorna as reservas cuja
+    data não pôde ser convertida e foram para a quarentena (ver migrar_datas);
+    levanta ReservasConflitantes se houver reservas na mesma sala e data.
+    """
     db.create_all()
+    invalidas = migrar_datas()
+    criar_indices()
+    criar_versoes()
+    return invalidas
+
+
+@click.command('init-db')
+@with_appcontext
+def init_db():
+    """Cria o schema do banco (flask --app app init-db)."""
+    try:
+        invalidas = criar_schema()
+    except ReservasConflitantes as e:
+        raise click.ClickException(f'{e}. Remova ou corrija as duplicadas e rode init-db de novo.')
+    click.echo('Schema criado.')
+    for id, valor in invalidas:
+        click.echo(f'Reserva {id}: data {valor!r} não reconhecida; movida para reservas_quarentena.', err=True)
+
+
+def create_app(config=Config):
+    app = Flask(__name__)
+    app.config.from_object(config)
+    app.secret_key = 'projeto-API'
+
+    if app.config.get('ENABLE_DOCS'):
+        # Importado só quando a documentação está habilitada: o flasgger
+        # e suas dependências pesam na inicialização de cada worker
+        from flasgger import Swagger
+        Swagger(app)
+    db.init_app(app)
+    configurar_sqlite(app)
+    configurar_perfil_sql(app)
+    configurar_json(app)
+    configurar_compressao(app)
+    configurar_metricas(app, db)
+    gerenciamento.init_app(app)
+    setup_routes(app)
+
+    app.cli.add_command(init_db)
+
+    return app
+
 
 if __name__ == "__main__":
+    app = create_app()
+    # O schema é criado uma vez aqui, e não em cada worker
+    with app.app_context():
+        criar_schema()
+    # SERVIDOR=gunicorn sobe o modo de produção (ver gunicorn.conf.py)
+    if os.getenv("SERVIDOR") == "gunicorn":
+        os.execvp("gunicorn", ["gunicorn", "-c", "gunicorn.conf.py", "wsgi:app"])
     app.run(host="0.0.0.0", port=5000, debug=True)
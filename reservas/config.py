@@ -1,8 +1,70 @@
 import os
 
-basedir = os.path.abspath(os.path.dirname(__file__))
+
+def _url_banco(padrao):
+    """DATABASE_URL do ambiente (aceitando o esquema legado postgres://) ou o SQLite padrão."""
+    url = os.getenv("DATABASE_URL") or padrao
+    if url.startswith("postgres://"):
+        url = "postgresql://" + url[len("postgres://"):]
+    return url
+
+
+def _opcoes_engine(url):
+    """Opções do pool de conexões; tamanho e overflow só se aplicam fora do SQLite."""
+    opcoes = {
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "1") == "1",
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+    }
+    if not url.startswith("sqlite"):
+        opcoes["pool_size"] = int(os.getenv("DB_POOL_SIZE", "5"))
+        opcoes["max_overflow"] = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+        opcoes["pool_timeout"] = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+    return opcoes
+
 
 class Config:
-    SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL", "sqlite:///" + os.path.join(basedir, "reservas.db"))
+    # Sem DATABASE_URL, usa o SQLite na pasta instance/ do serviço
+    SQLALCHEMY_DATABASE_URI = _url_banco("sqlite:///database.db")
+    SQLALCHEMY_ENGINE_OPTIONS = _opcoes_engine(SQLALCHEMY_DATABASE_URI)
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-    GERENCIAMENTO_BASE_URL = os.getenv("GERENCIAMENTO_BASE_URL", "http://gerenciamento:5000") 
+    # Swagger em /apidocs, só com ENABLE_DOCS=1: o flasgger pesa na inicialização dos workers
+    ENABLE_DOCS = os.getenv("ENABLE_DOCS", "0") == "1"
+    # Serializa as respostas com o orjson (dependência opcional) em vez do json padrão
+    JSON_ORJSON = os.getenv("JSON_ORJSON", "0") == "1"
+    # max-age (segundos) do Cache-Control nas listagens; 0 manda o cliente revalidar sempre (ETag)
+    HTTP_CACHE_MAX_AGE = int(os.getenv("HTTP_CACHE_MAX_AGE", "0"))
+    # Compressão gzip/brotli das respostas JSON, NDJSON e CSV (Accept-Encoding)
+    COMPRESSAO = os.getenv("COMPRESSAO", "0") == "1"
+    COMPRESSAO_MINIMO = int(os.getenv("COMPRESSAO_MINIMO", "1024"))
+    COMPRESSAO_NIVEL = int(os.getenv("COMPRESSAO_NIVEL", "6"))
+    COMPRESSAO_NIVEL_BROTLI = int(os.getenv("COMPRESSAO_NIVEL_BROTLI", "4"))
+    # Contadores e histogramas de latência em GET /metrics (formato Prometheus)
+    METRICAS = os.getenv("METRICAS", "1") == "1"
+    # Comandos SQL mais lentos que isto (ms) vão para o log; 0 desliga
+    SQL_LENTO_MS = float(os.getenv("SQL_LENTO_MS", "200"))
+    # Perfil de SQL por requisição (log + Server-Timing): sempre, ou só com X-Debug-SQL: 1
+    SQL_PERFIL = os.getenv("SQL_PERFIL", "0") == "1"
+    # O cabeçalho X-Debug-SQL fica desligado por padrão: qualquer cliente poderia pedir o perfil
+    SQL_PERFIL_HEADER = os.getenv("SQL_PERFIL_HEADER", "0") == "1"
+    # Perfil de PRAGMAs do SQLite: "otimizado" (WAL, busy_timeout, ...) ou "padrao"
+    SQLITE_PERFIL = os.getenv("SQLITE_PERFIL", "otimizado")
+    GERENCIAMENTO_BASE_URL = os.getenv("GERENCIAMENTO_BASE_URL", "http://gerenciamento:5000")
+
+    # Cache das consultas de existência no Gerenciamento (TTL em segundos)
+    GERENCIAMENTO_CACHE_TAMANHO = int(os.getenv("GERENCIAMENTO_CACHE_TAMANHO", "10000"))
+    GERENCIAMENTO_CACHE_TTL = float(os.getenv("GERENCIAMENTO_CACHE_TTL", "60"))
+    GERENCIAMENTO_CACHE_TTL_NEGATIVO = float(os.getenv("GERENCIAMENTO_CACHE_TTL_NEGATIVO", "10"))
+    # Intervalo de leitura do feed /mudancas do Gerenciamento; 0 desabilita
+    GERENCIAMENTO_FEED_INTERVALO = float(os.getenv("GERENCIAMENTO_FEED_INTERVALO", "0"))
+    # Intervalo de sincronização da réplica local de alunos/turmas/professores,
+    # usada nas validações antes do Gerenciamento; 0 desabilita
+    GERENCIAMENTO_REPLICA_INTERVALO = float(os.getenv("GERENCIAMENTO_REPLICA_INTERVALO", "0"))
+
+    # Cliente HTTP do Gerenciamento (pool keep-alive, timeouts em segundos e disjuntor)
+    GERENCIAMENTO_POOL_TAMANHO = int(os.getenv("GERENCIAMENTO_POOL_TAMANHO", "10"))
+    GERENCIAMENTO_TIMEOUT_CONEXAO = float(os.getenv("GERENCIAMENTO_TIMEOUT_CONEXAO", "2"))
+    GERENCIAMENTO_TIMEOUT_LEITURA = float(os.getenv("GERENCIAMENTO_TIMEOUT_LEITURA", "5"))
+    GERENCIAMENTO_TENTATIVAS = int(os.getenv("GERENCIAMENTO_TENTATIVAS", "2"))
+    GERENCIAMENTO_BACKOFF = float(os.getenv("GERENCIAMENTO_BACKOFF", "0.2"))
+    GERENCIAMENTO_DISJUNTOR_FALHAS = int(os.getenv("GERENCIAMENTO_DISJUNTOR_FALHAS", "5"))
+    GERENCIAMENTO_DISJUNTOR_ESPERA = float(os.getenv("GERENCIAMENTO_DISJUNTOR_ESPERA", "30"))
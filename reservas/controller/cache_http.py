@@ -0,0 +1,77 @@
+import hashlib
+from datetime import datetime, timedelta, timezone
+from functools import wraps
+from flask import Response, current_app, request
+from models.versao_model import ler_versoes
+from controller.streaming import quer_ndjson
+from controller.compressao import SUFIXOS_ETAG
+
+
+def _aplicar_cabecalhos(resposta, etag, last_modified):
+    resposta.set_etag(etag)
+    if last_modified is not None:
+        resposta.last_modified = last_modified
+    max_age = current_app.config.get('HTTP_CACHE_MAX_AGE', 0)
+    if max_age > 0:
+        resposta.cache_control.max_age = max_age
+        resposta.cache_control.must_revalidate = True
+    else:
+        resposta.cache_control.no_cache = True
+    resposta.vary.add('Accept')
+    return resposta
+
+
+def _segundo_seguinte(data):
+    """
+    `data` arredondada para cima até o segundo, a precisão do Last-Modified.
+    Com o valor truncado, uma escrita no mesmo segundo da leitura anterior
+    ainda receberia 304.
+    """
+    inteira = data.replace(microsecond=0)
+    return inteira + timedelta(seconds=1) if data.microsecond else inteira
+
+
+def cache_http(*tabelas):
+    """
+    Respostas condicionais (ETag / Last-Modified) para rotas de leitura cujo
+    resultado depende só de `tabelas`.
+
+    A ETag combina a versão de cada tabela (models.versao_model) com a URL e
+    o formato pedido. Se o cliente já tem essa versão (If-None-Match ou
+    If-Modified-Since), responde 304 com uma única consulta à versao_tabela,
+    sem executar a rota. Com If-None-Match, só a ETag decide.
+    """
+    def decorador(rota):
+        @wraps(rota)
+        def envolvida(*args, **kwargs):
+            # As versões são lidas antes dos dados: se houver um commit no
+            # meio, a ETag fica antiga e a próxima requisição busca de novo
+            versoes = ler_versoes(tabelas)
+            chave = '|'.join([f'{t}:{versoes.get(t, (0,))[0]}' for t in sorted(tabelas)]
+                             + [request.full_path, 'ndjson' if quer_ndjson() else 'json'])
+            etag = hashlib.sha1(chave.encode()).hexdigest()[:20]
+            datas = [data for _, data in versoes.values()]
+            ultima_alteracao = _segundo_seguinte(max(datas).replace(tzinfo=timezone.utc)) if datas else None
+            # Enquanto o segundo de ultima_alteracao não passou, outra escrita ainda
+            # pode cair nele: o Last-Modified só é enviado depois disso
+            last_modified = (ultima_alteracao if ultima_alteracao is not None
+                             and ultima_alteracao <= datetime.now(timezone.utc) else None)
+
+            if request.if_none_match:
+                # A resposta comprimida leva a ETag com sufixo (controller.compressao)
+                variantes = [etag] + [etag + sufixo for sufixo in SUFIXOS_ETAG.values()]
+                recebida = next((v for v in variantes if request.if_none_match.contains(v)), None)
+            elif (request.if_modified_since is not None and ultima_alteracao is not None
+                  and ultima_alteracao <= request.if_modified_since):
+                recebida = etag
+            else:
+                recebida = None
+            if recebida is not None:
+                return _aplicar_cabecalhos(Response(status=304), recebida, last_modified)
+
+            resposta = current_app.make_response(rota(*args, **kwargs))
+            if resposta.status_code == 200:
+                _aplicar_cabecalhos(resposta, etag, last_modified)
+            return resposta
+        return envolvida
+    return decorador
@@ -0,0 +1,90 @@
+import gzip
+import zlib
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # dependência opcional (pip install brotli)
+    brotli = None
+
+# Tipos de resposta comprimidos; o JSON das listagens reduz cerca de 10x
+TIPOS_COMPRIMIVEIS = ('application/json', 'application/x-ndjson', 'text/csv', 'text/plain')
+
+# Sufixo da ETag de cada codificação: a representação comprimida é outra
+# sequência de bytes, então não pode ter a mesma ETag forte
+SUFIXOS_ETAG = {'gzip': '-gzip', 'br': '-br'}
+
+
+def _escolher_codificacao():
+    aceitas = request.accept_encodings
+    qualidade_br = aceitas.quality('br') if brotli is not None else 0
+    qualidade_gzip = aceitas.quality('gzip')
+    if qualidade_br and qualidade_br >= qualidade_gzip:
+        return 'br'
+    if qualidade_gzip:
+        return 'gzip'
+    return None
+
+
+def _comprimir(dados, codificacao, config):
+    if codificacao == 'br':
+        return brotli.compress(dados, quality=config['COMPRESSAO_NIVEL_BROTLI'])
+    return gzip.compress(dados, compresslevel=config['COMPRESSAO_NIVEL'], mtime=0)
+
+
+def _comprimir_stream(origem, codificacao, config):
+    """Comprime cada bloco do stream e o envia em seguida (flush), sem esperar o fim."""
+    if codificacao == 'br':
+        compressor = brotli.Compressor(quality=config['COMPRESSAO_NIVEL_BROTLI'])
+        comprimir, descarregar, finalizar = compressor.process, compressor.flush, compressor.finish
+    else:
+        # wbits=31: formato gzip (cabeçalho e CRC), e não zlib puro
+        compressor = zlib.compressobj(config['COMPRESSAO_NIVEL'], zlib.DEFLATED, 31)
+        comprimir, finalizar = compressor.compress, compressor.flush
+        descarregar = lambda: compressor.flush(zlib.Z_SYNC_FLUSH)
+    try:
+        for bloco in origem:
+            if isinstance(bloco, str):
+                bloco = bloco.encode('utf-8')
+            yield comprimir(bloco) + descarregar()
+        yield finalizar()
+    finally:
+        fechar = getattr(origem, 'close', None)
+        if fechar is not None:
+            fechar()
+
+
+def configurar_compressao(app):
+    """
+    Comprime com gzip ou brotli (conforme o Accept-Encoding) as respostas
+    JSON/NDJSON/CSV quando COMPRESSAO está ativa. Respostas menores que
+    COMPRESSAO_MINIMO bytes seguem sem compressão; as transmitidas (NDJSON)
+    são sempre comprimidas, bloco a bloco.
+    """
+    if not app.config.get('COMPRESSAO'):
+        return
+
+    @app.after_request
+    def comprimir_resposta(resposta):
+        if (resposta.mimetype not in TIPOS_COMPRIMIVEIS or resposta.direct_passthrough
+                or 'Content-Encoding' in resposta.headers or not 200 <= resposta.status_code < 300):
+            return resposta
+        resposta.vary.add('Accept-Encoding')
+        codificacao = _escolher_codificacao()
+        if codificacao is None:
+            return resposta
+
+        if resposta.is_streamed:
+            resposta.response = _comprimir_stream(resposta.response, codificacao, app.config)
+            resposta.headers.pop('Content-Length', None)
+        else:
+            dados = resposta.get_data()
+            if len(dados) < app.config['COMPRESSAO_MINIMO']:
+                return resposta
+            resposta.set_data(_comprimir(dados, codificacao, app.config))
+
+        resposta.headers['Content-Encoding'] = codificacao
+        etag, fraca = resposta.get_etag()
+        if etag and not fraca:
+            resposta.set_etag(etag + SUFIXOS_ETAG[codificacao])
+        return resposta
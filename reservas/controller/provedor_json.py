@@ -0,0 +1,35 @@
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # dependência opcional (pip install orjson)
+    orjson = None
+
+
+class ProvedorOrjson(DefaultJSONProvider):
+    """
+    Provedor JSON do Flask baseado no orjson, bem mais rápido que o json da
+    biblioteca padrão nas listagens grandes. Tipos que o orjson não conhece
+    passam pelo default() do Flask.
+    """
+
+    def dumps(self, obj, **kwargs):
+        opcoes = orjson.OPT_NON_STR_KEYS
+        if kwargs.get('indent'):
+            opcoes |= orjson.OPT_INDENT_2
+        if kwargs.get('sort_keys', self.sort_keys):
+            opcoes |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=self.default, option=opcoes).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+def configurar_json(app):
+    """Troca o provedor JSON do app pelo orjson quando JSON_ORJSON está ativo."""
+    if not app.config.get('JSON_ORJSON'):
+        return
+    if orjson is None:
+        app.logger.warning('JSON_ORJSON ativo, mas o orjson não está instalado; usando o json padrão.')
+        return
+    app.json = ProvedorOrjson(app)
@@ -1,7 +1,32 @@
 import os
+from datetime import date, datetime, timedelta
 import requests
 from flask import request, jsonify, current_app
-from models.reserva_model import db, Reserva
+from sqlalchemy.exc import IntegrityError
+from models.reserva_model import db, Reserva, SERIALIZADOR_RESERVA
+from models.disponibilidade import mapa
+from models import replica_model
+from controller.streaming import quer_ndjson, resposta_ndjson
+from controller.cache_http import cache_http
+from clients import gerenciamento
+from controller.filtros import FiltroInvalido, condicoes_igualdade, condicoes_intervalo, filtro_booleano, filtro_data
+
+# Intervalo padrão e máximo (em dias) da consulta de disponibilidade
+DIAS_DISPONIBILIDADE_PADRAO = 30
+DIAS_DISPONIBILIDADE_MAXIMO = 366
+
+
+def _ler_data(valor):
+    """Converte AAAA-MM-DD em date; levanta ValueError se inválida."""
+    return datetime.strptime(str(valor), '%Y-%m-%d').date()
+
+
+def _reserva_conflitante(num_sala, data, ignorar_id=None):
+    """Busca, pelo índice (num_sala, data), outra reserva da sala no mesmo dia."""
+    consulta = db.select(Reserva.id).where(Reserva.num_sala == num_sala, Reserva.data == data)
+    if ignorar_id is not None:
+        consulta = consulta.where(Reserva.id != ignorar_id)
+    return db.session.execute(consulta.limit(1)).scalar()
 
 
 def setup_routes(app):
@@ -9,6 +34,7 @@ def setup_routes(app):
     # ------------------ CRUD Reservas ------------------
 
     @app.route('/reservas', methods=['GET'])
+    @cache_http('reservas')
     def list_reservas():
         """
         Lista todas as reservas
@@ -16,18 +42,55 @@ def setup_routes(app):
         tags:
           - Reservas
         summary: Lista todas as reservas cadastradas
+        parameters:
+          - in: query
+            name: stream
+            schema: { type: boolean }
+            required: false
+            description: Transmite a lista em NDJSON (equivale a Accept application/x-ndjson)
+          - in: query
+            name: turma_id
+            schema: { type: integer }
+            required: false
+            description: Retorna apenas as reservas da turma
+          - in: query
+            name: num_sala
+            schema: { type: integer }
+            required: false
+            description: Retorna apenas as reservas da sala
+          - in: query
+            name: lab
+            schema: { type: boolean }
+            required: false
+            description: true para laboratórios, false para salas comuns
+          - in: query
+            name: de
+            schema: { type: string }
+            required: false
+            description: Data mínima da reserva (AAAA-MM-DD)
+          - in: query
+            name: ate
+            schema: { type: string }
+            required: false
+            description: Data máxima da reserva (AAAA-MM-DD)
         responses:
           200:
             description: Lista de reservas
+          400:
+            description: Parâmetro de filtro inválido
         """
-        reservas = Reserva.query.all()
-        return jsonify([{
-            'id': r.id,
-            'num_sala': r.num_sala,
-            'lab': r.lab,
-            'data': r.data,
-            'turma_id': r.turma_id
-        } for r in reservas]), 200
+        try:
+            condicoes = (condicoes_igualdade(Reserva, ('turma_id', 'num_sala'))
+                         + condicoes_igualdade(Reserva, ('lab',), filtro_booleano)
+                         + condicoes_intervalo(Reserva.data))
+        except FiltroInvalido as e:
+            return jsonify({'mensagem': str(e)}), 400
+
+        if quer_ndjson():
+            return resposta_ndjson(
+                SERIALIZADOR_RESERVA.select().where(*condicoes).order_by(Reserva.id), SERIALIZADOR_RESERVA)
+
+        return jsonify(SERIALIZADOR_RESERVA.listar(*condicoes)), 200
 
     @app.route('/reservas', methods=['POST'])
     def create_reserva():
@@ -65,7 +128,9 @@ def setup_routes(app):
           201:
             description: Reserva criada com sucesso
           400:
-            description: Turma não encontrada
+            description: Turma não encontrada ou dados inválidos
+          409:
+            description: A sala já está reservada nesta data
           502:
             description: Erro ao consultar serviço de Gerenciamento
         """
@@ -73,30 +138,47 @@ def setup_routes(app):
         payload = request.json
         turma_id = payload.get("turma_id")
 
+        try:
+            num_sala = int(payload["num_sala"])
+            data_reserva = _ler_data(payload["data"])
+        except (KeyError, TypeError, ValueError):
+            return {"mensagem": "num_sala deve ser um número inteiro e data estar no formato AAAA-MM-DD"}, 400
+
+        conflito = _reserva_conflitante(num_sala, data_reserva)
+        if conflito:
+            return {"mensagem": f"Sala {num_sala} já reservada em {data_reserva.isoformat()} (reserva {conflito})"}, 409
+
         base = request.environ.get(
             "GERENCIAMENTO_BASE_URL") or current_app.config["GERENCIAMENTO_BASE_URL"]
         try:
-            resp = requests.get(f"{base}/turmas/{turma_id}")
+            status = gerenciamento.consultar(base, 'turmas', turma_id)
         except requests.exceptions.RequestException:
             return {"mensagem": "Erro ao se comunicar com o serviço de Gerenciamento"}, 502
 
-        if resp.status_code == 404:
+        if status == 404:
             return {"mensagem": f"Turma {turma_id} não encontrada no serviço de Gerenciamento"}, 400
-        if resp.status_code >= 400:
+        if status >= 400:
             return {"mensagem": "Erro ao consultar serviço de Gerenciamento"}, 502
 
         r = Reserva(
-            num_sala=payload.get("num_sala"),
+            num_sala=num_sala,
             lab=payload.get("lab", False),
-            data=payload["data"],
+            data=data_reserva,
             turma_id=turma_id
         )
         db.session.add(r)
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Outra requisição reservou a mesma sala e data após a checagem
+            db.session.rollback()
+            return {"mensagem": f"Sala {num_sala} já reservada em {data_reserva.isoformat()}"}, 409
+        mapa.ocupar(r.num_sala, r.data, r.lab)
 
         return r.to_dict(), 201
 
     @app.route('/reservas/<int:id>', methods=['GET'])
+    @cache_http('reservas')
     def get_reserva(id):
         """
         Obtém uma reserva pelo ID
@@ -119,13 +201,7 @@ def setup_routes(app):
         r = Reserva.query.get(id)
         if not r:
             return jsonify({'mensagem': 'Reserva não encontrada'}), 404
-        return jsonify({
-            'id': r.id,
-            'num_sala': r.num_sala,
-            'lab': r.lab,
-            'data': r.data,
-            'turma_id': r.turma_id
-        }), 200
+        return jsonify(r.to_dict()), 200
 
     @app.route('/reservas/<int:id>', methods=['PUT'])
     def update_reserva(id):
@@ -158,6 +234,8 @@ def setup_routes(app):
             description: Reserva não encontrada
           400:
             description: Turma inexistente ou dados inválidos
+          409:
+            description: A sala já está reservada nesta data
         """
         r = Reserva.query.get(id)
         if not r:
@@ -165,28 +243,44 @@ def setup_routes(app):
 
         data = request.get_json()
 
+        try:
+            num_sala = int(data.get('num_sala', r.num_sala))
+            data_reserva = _ler_data(data['data']) if 'data' in data else r.data
+        except (TypeError, ValueError):
+            return jsonify({"mensagem": "num_sala deve ser um número inteiro e data estar no formato AAAA-MM-DD"}), 400
+
+        conflito = _reserva_conflitante(num_sala, data_reserva, ignorar_id=r.id)
+        if conflito:
+            return jsonify({"mensagem": f"Sala {num_sala} já reservada em {data_reserva.isoformat()} (reserva {conflito})"}), 409
+
         turma_id = data.get('turma_id')
         if turma_id:
             base = request.environ.get(
                 "GERENCIAMENTO_BASE_URL") or current_app.config["GERENCIAMENTO_BASE_URL"]
 
             try:
-                resp = requests.get(f"{base}/turmas/{turma_id}")
+                status = gerenciamento.consultar(base, 'turmas', turma_id)
             except requests.exceptions.RequestException:
                 return jsonify({"mensagem": "Erro ao se comunicar com o serviço de Gerenciamento"}), 502
 
-            if resp.status_code == 404:
+            if status == 404:
                 return jsonify({"mensagem": f"Turma {turma_id} não encontrada no serviço de Gerenciamento"}), 400
-            elif resp.status_code >= 400:
+            elif status >= 400:
                 return jsonify({"mensagem": "Erro ao consultar serviço de Gerenciamento"}), 502
 
             r.turma_id = turma_id
 
-        r.num_sala = data.get('num_sala', r.num_sala)
+        anterior = (r.num_sala, r.data, r.lab)
+        r.num_sala = num_sala
         r.lab = data.get('lab', r.lab)
-        r.data = data.get('data', r.data)
+        r.data = data_reserva
 
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            return jsonify({"mensagem": f"Sala {num_sala} já reservada em {data_reserva.isoformat()}"}), 409
+        mapa.registrar(ocupar=[(r.num_sala, r.data, r.lab)], liberar=[anterior])
         return jsonify({'mensagem': 'Reserva atualizada com sucesso'}), 200
 
     @app.route('/reservas/<int:id>', methods=['DELETE'])
@@ -213,4 +307,156 @@ def setup_routes(app):
             return jsonify({'mensagem': 'Reserva não encontrada'}), 404
         db.session.delete(r)
         db.session.commit()
+        mapa.liberar(r.num_sala, r.data, r.lab)
         return jsonify({'message': 'Reserva deletada'}), 200
+
+    # ------------------ Disponibilidade de salas ------------------
+
+    @app.route('/salas/<int:num_sala>/disponibilidade', methods=['GET'])
+    def disponibilidade_sala(num_sala):
+        """
+        Consulta os dias livres de uma sala
+        ---
+        tags:
+          - Salas
+        summary: Lista os dias livres e ocupados de uma sala em um intervalo
+        parameters:
+          - in: path
+            name: num_sala
+            schema: { type: integer }
+            required: true
+          - in: query
+            name: de
+            schema: { type: string, format: date }
+            required: false
+            description: Primeiro dia do intervalo (padrão hoje)
+          - in: query
+            name: ate
+            schema: { type: string, format: date }
+            required: false
+            description: Último dia do intervalo (padrão de + 30 dias, no máximo 366 dias)
+        responses:
+          200:
+            description: Dias livres e reservas da sala no intervalo
+          400:
+            description: Intervalo inválido
+        """
+        try:
+            de = filtro_data('de') or date.today()
+            ate = filtro_data('ate') or de + timedelta(days=DIAS_DISPONIBILIDADE_PADRAO)
+        except FiltroInvalido as e:
+            return jsonify({'mensagem': str(e)}), 400
+        dias = (ate - de).days + 1
+        if dias < 1 or dias > DIAS_DISPONIBILIDADE_MAXIMO:
+            return jsonify({'mensagem': f'O intervalo deve ter entre 1 e {DIAS_DISPONIBILIDADE_MAXIMO} dias.'}), 400
+
+        # Varredura de intervalo no índice (num_sala, data): lê só as reservas da sala no período
+        ocupadas = db.session.execute(
+            db.select(Reserva.data, Reserva.id, Reserva.turma_id)
+            .where(Reserva.num_sala == num_sala, Reserva.data >= de, Reserva.data <= ate)
+            .order_by(Reserva.data)
+        ).all()
+        dias_ocupados = {o.data for o in ocupadas}
+
+        return jsonify({
+            'num_sala': num_sala,
+            'de': de.isoformat(),
+            'ate': ate.isoformat(),
+            'livres': [(de + timedelta(days=i)).isoformat() for i in range(dias)
+                       if de + timedelta(days=i) not in dias_ocupados],
+            'ocupadas': [{'data': o.data.isoformat(), 'reserva_id': o.id, 'turma_id': o.turma_id}
+                         for o in ocupadas]
+        }), 200
+
+    @app.route('/disponibilidade', methods=['GET'])
+    def disponibilidade():
+        """
+        Consulta as salas livres em uma data
+        ---
+        tags:
+          - Salas
+        summary: Salas livres e ocupadas em uma data, respondido pelo mapa em memória
+        parameters:
+          - in: query
+            name: data
+            schema: { type: string, format: date }
+            required: true
+          - in: query
+            name: lab
+            schema: { type: boolean }
+            required: false
+            description: true para só laboratórios, false para só salas comuns
+        responses:
+          200:
+            description: Salas livres e ocupadas entre as salas conhecidas
+          400:
+            description: Parâmetros inválidos
+        """
+        try:
+            dia = filtro_data('data')
+            lab = filtro_booleano('lab')
+        except FiltroInvalido as e:
+            return jsonify({'mensagem': str(e)}), 400
+        if dia is None:
+            return jsonify({'mensagem': 'Informe a data no formato AAAA-MM-DD.'}), 400
+
+        livres, ocupadas = mapa.salas(dia, lab)
+        return jsonify({'data': dia.isoformat(), 'livres': livres, 'ocupadas': ocupadas}), 200
+
+    @app.route('/disponibilidade/verificacao', methods=['GET'])
+    def verificar_disponibilidade():
+        """
+        Confere o mapa de disponibilidade com o banco
+        ---
+        tags:
+          - Salas
+        summary: Compara o mapa em memória com a tabela reservas
+        parameters:
+          - in: query
+            name: corrigir
+            schema: { type: boolean }
+            required: false
+            description: Reconstrói o mapa a partir do banco se houver divergência
+        responses:
+          200:
+            description: Resultado da verificação (ano nulo indica divergência na marcação de laboratório)
+        """
+        try:
+            corrigir = bool(filtro_booleano('corrigir'))
+        except FiltroInvalido as e:
+            return jsonify({'mensagem': str(e)}), 400
+
+        divergentes = mapa.verificar(corrigir)
+        return jsonify({
+            'consistente': not divergentes,
+            'divergencias': [{'num_sala': sala, 'ano': ano} for sala, ano in divergentes],
+            'corrigido': bool(divergentes) and corrigir
+        }), 200
+
+    @app.route('/cache/gerenciamento', methods=['GET'])
+    def cache_gerenciamento():
+        """
+        Estatísticas do cache de consultas ao Gerenciamento
+        ---
+        tags:
+          - Cache
+        summary: Acertos, falhas e ocupação do cache de turmas
+        responses:
+          200:
+            description: Estatísticas do cache
+        """
+        return jsonify(gerenciamento.cache.estatisticas()), 200
+
+    @app.route('/replica/gerenciamento', methods=['GET'])
+    def replica_gerenciamento():
+        """
+        Situação da réplica local do Gerenciamento
+        ---
+        tags:
+          - Cache
+        summary: Cursor, última sincronização e registros da réplica de turmas
+        responses:
+          200:
+            description: Situação da réplica (GERENCIAMENTO_REPLICA_INTERVALO > 0)
+        """
+        return jsonify(replica_model.estatisticas()), 200
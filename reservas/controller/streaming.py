@@ -0,0 +1,35 @@
+from flask import Response, current_app, request, stream_with_context
+from models.reserva_model import db
+
+# Quantidade de linhas lidas do banco por vez no modo streaming
+TAMANHO_LOTE = 1000
+
+
+def quer_ndjson():
+    """Indica se o cliente pediu a listagem em NDJSON (Accept ou ?stream=1)."""
+    if request.args.get('stream', '').lower() in ('1', 'true'):
+        return True
+    return request.accept_mimetypes.best == 'application/x-ndjson'
+
+
+def resposta_ndjson(consulta, serializador):
+    """
+    Transmite o resultado de `consulta` como NDJSON, um registro por linha,
+    convertido com `serializador` (models.serializacao).
+
+    As linhas são lidas do banco em lotes de TAMANHO_LOTE (yield_per) e
+    enviadas conforme são lidas, então a memória usada não depende do
+    tamanho da tabela.
+    """
+    # Usa o provedor JSON do app (orjson, se configurado)
+    dumps = current_app.json.dumps
+
+    def gerar():
+        resultado = db.session.execute(consulta.execution_options(yield_per=TAMANHO_LOTE))
+        for lote in resultado.partitions():
+            yield ''.join(
+                dumps(serializador.de_linha(linha), ensure_ascii=False, sort_keys=False) + '\n'
+                for linha in lote
+            )
+
+    return Response(stream_with_context(gerar()), mimetype='application/x-ndjson')
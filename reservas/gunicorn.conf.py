@@ -0,0 +1,56 @@
+import multiprocessing
+import os
+
+# Configuração do modo de produção (SERVIDOR=gunicorn). Cada worker é um
+# processo com a sua própria aplicação; GUNICORN_THREADS > 1 usa o worker
+# gthread, que atende várias requisições por processo.
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+workers = int(os.getenv("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+# GUNICORN_WORKER_CLASS=gevent troca as threads por greenlets: enquanto uma
+# escrita espera a validação no Gerenciamento, o worker atende as outras, até
+# GUNICORN_WORKER_CONNECTIONS conexões simultâneas por processo.
+worker_class = os.getenv("GUNICORN_WORKER_CLASS") or ("gthread" if threads > 1 else "sync")
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", "1000"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+# Recicla os workers periodicamente para limitar vazamentos de memória
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "10000"))
+max_requests_jitter = max_requests // 10
+accesslog = "-"
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOGLEVEL", "info")
+
+if worker_class == "gevent":
+    # Com centenas de validações em andamento, um pool de 10 conexões
+    # descartaria as excedentes e abriria conexões novas a cada chamada
+    os.environ.setdefault("GERENCIAMENTO_POOL_TAMANHO", "100")
+
+
+def _esperar_psycopg2(conexao, timeout=None):
+    """Callback de espera do psycopg2 que cede o controle ao hub do gevent."""
+    from gevent.socket import wait_read, wait_write
+    from psycopg2 import OperationalError, extensions
+
+    while True:
+        estado = conexao.poll()
+        if estado == extensions.POLL_OK:
+            return
+        if estado == extensions.POLL_READ:
+            wait_read(conexao.fileno(), timeout=timeout)
+        elif estado == extensions.POLL_WRITE:
+            wait_write(conexao.fileno(), timeout=timeout)
+        else:
+            raise OperationalError(f"Estado inesperado do poll: {estado}")
+
+
+def post_fork(server, worker):
+    # O monkey patching do gevent não alcança o driver em C do psycopg2:
+    # sem o callback, cada consulta ao PostgreSQL pararia o worker inteiro
+    if worker_class != "gevent":
+        return
+    try:
+        from psycopg2 import extensions
+    except ImportError:
+        return
+    extensions.set_wait_callback(_esperar_psycopg2)
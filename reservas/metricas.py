@@ -0,0 +1,164 @@
+"""
+Métricas do serviço no formato de texto do Prometheus, expostas em GET /metrics.
+
+Os valores ficam em memória, por processo: com o Gunicorn, cada worker tem
+as próprias séries. Registrar uma observação custa uma busca binária no
+bucket e um lock, então o custo por requisição fica em poucos microssegundos.
+"""
+import bisect
+import threading
+import time
+from flask import Response, g, request
+from sqlalchemy import event
+
+# Limites (em segundos) dos buckets dos histogramas de latência
+BUCKETS_PADRAO = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REGISTRO = []
+
+
+def _rotulos(nomes, valores):
+    if not nomes:
+        return ''
+    pares = []
+    for nome, valor in zip(nomes, valores):
+        valor = str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pares.append(f'{nome}="{valor}"')
+    return '{' + ','.join(pares) + '}'
+
+
+class Contador:
+    tipo = 'counter'
+
+    def __init__(self, nome, ajuda, rotulos=()):
+        self.nome, self.ajuda, self.rotulos = nome, ajuda, tuple(rotulos)
+        self._valores = {}
+        self._trava = threading.Lock()
+        REGISTRO.append(self)
+
+    def inc(self, valores=(), quantidade=1):
+        with self._trava:
+            self._valores[valores] = self._valores.get(valores, 0) + quantidade
+
+    def amostras(self):
+        with self._trava:
+            itens = list(self._valores.items())
+        return [f'{self.nome}{_rotulos(self.rotulos, v)} {total}' for v, total in itens]
+
+
+class Medidor(Contador):
+    tipo = 'gauge'
+
+    def dec(self, valores=(), quantidade=1):
+        self.inc(valores, -quantidade)
+
+
+class Histograma:
+    tipo = 'histogram'
+
+    def __init__(self, nome, ajuda, rotulos=(), limites=BUCKETS_PADRAO):
+        self.nome, self.ajuda, self.rotulos = nome, ajuda, tuple(rotulos)
+        self.limites = tuple(limites)
+        self._series = {}
+        self._trava = threading.Lock()
+        REGISTRO.append(self)
+
+    def observar(self, valores, segundos):
+        indice = bisect.bisect_left(self.limites, segundos)
+        with self._trava:
+            serie = self._series.get(valores)
+            if serie is None:
+                serie = self._series[valores] = [[0] * (len(self.limites) + 1), 0.0]
+            serie[0][indice] += 1
+            serie[1] += segundos
+
+    def amostras(self):
+        with self._trava:
+            itens = [(v, list(contagens), soma) for v, (contagens, soma) in self._series.items()]
+        linhas = []
+        nomes_le = self.rotulos + ('le',)
+        for valores, contagens, soma in itens:
+            acumulado = 0
+            for limite, quantidade in zip(self.limites + ('+Inf',), contagens):
+                acumulado += quantidade
+                linhas.append(f'{self.nome}_bucket{_rotulos(nomes_le, valores + (limite,))} {acumulado}')
+            linhas.append(f'{self.nome}_sum{_rotulos(self.rotulos, valores)} {soma}')
+            linhas.append(f'{self.nome}_count{_rotulos(self.rotulos, valores)} {acumulado}')
+        return linhas
+
+
+REQUISICOES = Contador('http_requests_total', 'Requisições HTTP atendidas', ('method', 'route', 'status'))
+LATENCIA = Histograma('http_request_duration_seconds', 'Tempo até a resposta ser gerada',
+                      ('method', 'route'))
+EM_ANDAMENTO = Medidor('http_requests_in_flight', 'Requisições em andamento', ('method', 'route'))
+CONSULTAS_DB = Histograma('db_query_duration_seconds', 'Tempo de cada comando SQL', ('operation',))
+GERENCIAMENTO = Histograma('gerenciamento_request_duration_seconds',
+                           'Tempo das chamadas HTTP ao Gerenciamento', ('method', 'result'))
+
+
+def exposicao():
+    """Todas as métricas no formato de texto do Prometheus (versão 0.0.4)."""
+    linhas = []
+    for metrica in REGISTRO:
+        linhas.append(f'# HELP {metrica.nome} {metrica.ajuda}')
+        linhas.append(f'# TYPE {metrica.nome} {metrica.tipo}')
+        linhas.extend(metrica.amostras())
+    return '\n'.join(linhas) + '\n'
+
+
+def configurar_metricas(app, db):
+    """
+    Registra os hooks de requisição, os eventos de cursor do engine de `db`
+    e a rota GET /metrics, quando METRICAS está ativa.
+    """
+    if not app.config.get('METRICAS', True):
+        return
+
+    @app.before_request
+    def iniciar_medicao():
+        # Rótulo pelo modelo da rota (/alunos/<int:id>), nunca pela URL
+        regra = request.url_rule
+        g.metricas = (time.perf_counter(), (request.method, regra.rule if regra else 'sem_rota'))
+        EM_ANDAMENTO.inc(g.metricas[1])
+
+    @app.after_request
+    def registrar_medicao(resposta):
+        # Em respostas transmitidas, mede até o início do envio
+        inicio, rotulos = g.get('metricas', (None, None))
+        if inicio is not None:
+            LATENCIA.observar(rotulos, time.perf_counter() - inicio)
+            REQUISICOES.inc(rotulos + (resposta.status_code,))
+        return resposta
+
+    @app.teardown_request
+    def encerrar_medicao(erro):
+        inicio, rotulos = g.pop('metricas', (None, None))
+        if inicio is not None:
+            EM_ANDAMENTO.dec(rotulos)
+
+    with app.app_context():
+        engine = db.engine
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def iniciar_consulta(conexao, cursor, sql, parametros, contexto, executemany):
+        contexto._metricas_inicio = time.perf_counter()
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def registrar_consulta(conexao, cursor, sql, parametros, contexto, executemany):
+        # Só o início do comando: separar o SQL inteiro custaria uma cópia dele
+        CONSULTAS_DB.observar((sql[:10].split(None, 1)[0].upper(),),
+                              time.perf_counter() - contexto._metricas_inicio)
+
+    @app.route('/metrics', methods=['GET'])
+    def metrics():
+        """
+        Métricas do serviço
+        ---
+        tags:
+          - métricas
+        summary: Contadores e histogramas de latência no formato de texto do Prometheus
+        responses:
+          200:
+            description: Métricas deste processo
+        """
+        return Response(exposicao(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,143 @@
+import threading
+from .reserva_model import db, Reserva
+from .versao_model import ler_versoes
+
+
+class MapaDisponibilidade:
+    """
+    Ocupação das salas mantida em memória para consultas rápidas.
+
+    Para cada (sala, ano) guarda um inteiro usado como bitset: o bit N
+    indica que o dia N do ano (0 = 1º de janeiro) está reservado. As salas
+    conhecidas são as que têm alguma reserva; uma sala é laboratório se
+    alguma das suas reservas for de laboratório (contadas por sala).
+
+    O mapa é construído a partir da tabela reservas no primeiro uso (e não
+    na inicialização do worker) e guarda a versão da tabela (versao_tabela)
+    de que partiu. Cada processo tem a sua cópia: antes de responder, o mapa
+    compara essa versão com a atual e se reconstrói se outro worker tiver
+    alterado as reservas. As escritas do próprio processo são aplicadas
+    direto no mapa por registrar(), sem reconstrução.
+    """
+
+    def __init__(self):
+        self._bits = {}
+        self._labs = {}  # num_sala -> quantidade de reservas de laboratório (só > 0)
+        self._versao = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _posicao(data):
+        return data.year, data.timetuple().tm_yday - 1
+
+    @staticmethod
+    def _versao_atual():
+        tabela = Reserva.__tablename__
+        return ler_versoes((tabela,)).get(tabela, (0,))[0]
+
+    def carregar(self, versao=None):
+        """Reconstrói o mapa lendo apenas (num_sala, data, lab) de todas as reservas."""
+        # A versão é lida antes dos dados: um commit no meio só causa outra recarga
+        if versao is None:
+            versao = self._versao_atual()
+        bits, labs = self._montar()
+        with self._lock:
+            self._bits, self._labs, self._versao = bits, labs, versao
+
+    def _garantir_atualizado(self):
+        versao = self._versao_atual()
+        if versao != self._versao:
+            self.carregar(versao)
+
+    def _montar(self):
+        bits, labs = {}, {}
+        linhas = db.session.execute(
+            db.select(Reserva.num_sala, Reserva.data, Reserva.lab).execution_options(yield_per=5000))
+        for num_sala, data, lab in linhas:
+            ano, dia = self._posicao(data)
+            bits[(num_sala, ano)] = bits.get((num_sala, ano), 0) | (1 << dia)
+            if lab:
+                labs[num_sala] = labs.get(num_sala, 0) + 1
+        return bits, labs
+
+    def registrar(self, ocupar=(), liberar=()):
+        """
+        Aplica ao mapa um commit deste processo: libera os (num_sala, data, lab)
+        de `liberar` e ocupa os de `ocupar`.
+
+        Chamado logo após o commit. Se a versão da tabela avançou só uma vez
+        desde a do mapa, a alteração é este commit e basta ajustar os bits;
+        senão outro worker também escreveu, e o mapa é reconstruído.
+        """
+        versao = self._versao_atual()
+        with self._lock:
+            if self._versao is not None and versao == self._versao + 1:
+                for num_sala, data, lab in liberar:
+                    ano, dia = self._posicao(data)
+                    bits = self._bits.get((num_sala, ano), 0) & ~(1 << dia)
+                    if bits:
+                        self._bits[(num_sala, ano)] = bits
+                    else:
+                        self._bits.pop((num_sala, ano), None)
+                    if lab:
+                        restantes = self._labs.get(num_sala, 0) - 1
+                        if restantes > 0:
+                            self._labs[num_sala] = restantes
+                        else:
+                            self._labs.pop(num_sala, None)
+                for num_sala, data, lab in ocupar:
+                    ano, dia = self._posicao(data)
+                    self._bits[(num_sala, ano)] = self._bits.get((num_sala, ano), 0) | (1 << dia)
+                    if lab:
+                        self._labs[num_sala] = self._labs.get(num_sala, 0) + 1
+                self._versao = versao
+                return
+        self.carregar(versao)
+
+    def ocupar(self, num_sala, data, lab):
+        self.registrar(ocupar=[(num_sala, data, lab)])
+
+    def liberar(self, num_sala, data, lab):
+        self.registrar(liberar=[(num_sala, data, lab)])
+
+    def ocupada(self, num_sala, data):
+        self._garantir_atualizado()
+        ano, dia = self._posicao(data)
+        return bool(self._bits.get((num_sala, ano), 0) >> dia & 1)
+
+    def salas(self, data, lab=None):
+        """Retorna (livres, ocupadas) entre as salas conhecidas, opcionalmente só labs ou só salas comuns."""
+        self._garantir_atualizado()
+        ano, dia = self._posicao(data)
+        livres, ocupadas = [], []
+        for num_sala in sorted({sala for sala, _ in self._bits}):
+            if lab is not None and (num_sala in self._labs) != lab:
+                continue
+            if self._bits.get((num_sala, ano), 0) >> dia & 1:
+                ocupadas.append(num_sala)
+            else:
+                livres.append(num_sala)
+        return livres, ocupadas
+
+    def verificar(self, corrigir=False):
+        """
+        Compara o mapa com o banco e retorna as (sala, ano) com dias
+        divergentes, mais (sala, None) para as salas cuja contagem de reservas
+        de laboratório diverge. Com `corrigir`, substitui o mapa pelo estado
+        do banco.
+        """
+        self._garantir_atualizado()
+        versao = self._versao_atual()
+        bits, labs = self._montar()
+        with self._lock:
+            chaves = set(bits) | set(self._bits)
+            divergentes = [c for c in chaves if bits.get(c, 0) != self._bits.get(c, 0)]
+            divergentes += [(sala, None) for sala in set(labs) | set(self._labs)
+                            if labs.get(sala) != self._labs.get(sala)]
+            divergentes.sort(key=lambda c: (c[0], c[1] or 0))
+            if corrigir:
+                self._bits, self._labs, self._versao = bits, labs, versao
+        return divergentes
+
+
+mapa = MapaDisponibilidade()
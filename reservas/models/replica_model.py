@@ -0,0 +1,165 @@
+from datetime import datetime, timedelta
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+from .reserva_model import db
+
+# Ids por cláusula IN, abaixo do limite de parâmetros do SQLite
+TAMANHO_LOTE_IN = 500
+CHAVE_ESTADO = 'gerenciamento'
+
+
+class ReplicaTurma(db.Model):
+    """Cópia local de id, professor e situação das turmas do Gerenciamento."""
+    __tablename__ = 'replica_turma'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    professor_id = db.Column(db.Integer, nullable=False)
+    ativo = db.Column(db.Boolean, nullable=False)
+
+
+# Tabela da réplica de cada recurso do Gerenciamento validado por este serviço
+MODELOS_REPLICA = {
+    'turmas': ReplicaTurma,
+}
+
+
+class EstadoReplica(db.Model):
+    """
+    Cursor do feed /replicacao já aplicado e o processo que sincroniza a
+    réplica (com vários workers, só um deles atualiza as tabelas).
+    """
+    __tablename__ = 'replica_estado'
+
+    chave = db.Column(db.String(20), primary_key=True)
+    cursor = db.Column(db.Integer)
+    completa = db.Column(db.Boolean, nullable=False, default=False)
+    dono = db.Column(db.String(100))
+    renovado_em = db.Column(db.DateTime)
+    sincronizado_em = db.Column(db.DateTime)
+
+
+# As escritas da réplica usam a conexão direto, e não a sessão ORM, para não
+# incrementar a versao_tabela (models.versao_model) a cada sincronização
+
+def existe(recurso, id):
+    model = MODELOS_REPLICA[recurso]
+    return db.session.execute(db.select(model.id).where(model.id == id)).first() is not None
+
+
+def existentes(recurso, ids):
+    model = MODELOS_REPLICA[recurso]
+    lista = sorted(set(ids))
+    encontrados = set()
+    for i in range(0, len(lista), TAMANHO_LOTE_IN):
+        lote = lista[i:i + TAMANHO_LOTE_IN]
+        encontrados.update(db.session.execute(db.select(model.id).where(model.id.in_(lote))).scalars())
+    return encontrados
+
+
+def estado():
+    """A linha de estado, ou None se a réplica nunca foi sincronizada."""
+    return db.session.get(EstadoReplica, CHAVE_ESTADO)
+
+
+def completa():
+    """Se a carga inicial terminou, ou seja, se a ausência de um id na réplica é confiável."""
+    linha = estado()
+    return linha is not None and linha.completa
+
+
+def assumir_sincronizacao(dono, validade):
+    """
+    Renova (ou assume, se vencida há `validade` segundos) a posse da
+    sincronização para `dono`. Retorna True se `dono` deve sincronizar.
+    """
+    t = EstadoReplica.__table__
+    agora = datetime.utcnow()
+    conexao = db.session.connection()
+    resultado = conexao.execute(
+        t.update()
+        .where(t.c.chave == CHAVE_ESTADO,
+               or_(t.c.dono.is_(None), t.c.dono == dono, t.c.renovado_em < agora - timedelta(seconds=validade)))
+        .values(dono=dono, renovado_em=agora)
+    )
+    if not resultado.rowcount:
+        if estado() is not None:
+            db.session.rollback()
+            return False
+        try:
+            conexao.execute(t.insert().values(chave=CHAVE_ESTADO, completa=False, dono=dono, renovado_em=agora))
+        except IntegrityError:
+            # Outro worker criou a linha ao mesmo tempo
+            db.session.rollback()
+            return False
+    db.session.commit()
+    return True
+
+
+def iniciar_carga():
+    """Esvazia as tabelas da réplica e marca a carga como incompleta."""
+    conexao = db.session.connection()
+    conexao.execute(EstadoReplica.__table__.update()
+                    .where(EstadoReplica.chave == CHAVE_ESTADO)
+                    .values(completa=False, cursor=None))
+    for model in MODELOS_REPLICA.values():
+        conexao.execute(model.__table__.delete())
+    db.session.commit()
+
+
+def gravar(recurso, linhas):
+    """Insere ou substitui as `linhas` (dicionários com os campos da réplica) de `recurso`."""
+    t = MODELOS_REPLICA[recurso].__table__
+    conexao = db.session.connection()
+    ids = [linha['id'] for linha in linhas]
+    for i in range(0, len(ids), TAMANHO_LOTE_IN):
+        conexao.execute(t.delete().where(t.c.id.in_(ids[i:i + TAMANHO_LOTE_IN])))
+    if linhas:
+        conexao.execute(t.insert(), [{c: linha[c] for c in t.c.keys()} for linha in linhas])
+
+
+def remover(recurso, ids):
+    t = MODELOS_REPLICA[recurso].__table__
+    conexao = db.session.connection()
+    for i in range(0, len(ids), TAMANHO_LOTE_IN):
+        conexao.execute(t.delete().where(t.c.id.in_(ids[i:i + TAMANHO_LOTE_IN])))
+
+
+def aplicar(itens, cursor):
+    """
+    Aplica os itens de GET /replicacao (dados nulos = removido) e avança o
+    cursor, na mesma transação. Recursos não replicados aqui são ignorados.
+    """
+    gravados, removidos = {}, {}
+    for item in itens:
+        if item['recurso'] not in MODELOS_REPLICA:
+            continue
+        if item['dados'] is None:
+            removidos.setdefault(item['recurso'], []).append(item['id'])
+        else:
+            gravados.setdefault(item['recurso'], []).append(item['dados'])
+    for recurso, ids in removidos.items():
+        remover(recurso, ids)
+    for recurso, linhas in gravados.items():
+        gravar(recurso, linhas)
+    concluir(cursor)
+
+
+def concluir(cursor):
+    """Registra `cursor` como aplicado e a réplica como completa, e faz o commit."""
+    db.session.connection().execute(
+        EstadoReplica.__table__.update()
+        .where(EstadoReplica.chave == CHAVE_ESTADO)
+        .values(cursor=cursor, completa=True, sincronizado_em=datetime.utcnow())
+    )
+    db.session.commit()
+
+
+def estatisticas():
+    linha = estado()
+    return {
+        'completa': bool(linha and linha.completa),
+        'cursor': linha.cursor if linha else None,
+        'sincronizado_em': linha.sincronizado_em.isoformat() if linha and linha.sincronizado_em else None,
+        'registros': {recurso: db.session.query(db.func.count(model.id)).scalar()
+                      for recurso, model in MODELOS_REPLICA.items()},
+    }
@@ -1,6 +1,24 @@
+import logging
+import time
+from collections import Counter
+from datetime import date, datetime
+from itertools import groupby
+from flask import g, has_request_context, request
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
+from .serializacao import Serializador
 
 db = SQLAlchemy()
+logger = logging.getLogger(__name__)
+
+# Índices de versões anteriores substituídos por outros
+INDICES_REMOVIDOS = ('ix_reservas_num_sala_data',)
+
+# Formatos aceitos na migração das datas gravadas quando a coluna data era
+# texto livre (String(20)); o primeiro que reconhecer o valor é usado
+FORMATOS_DATA_LEGADOS = ('%Y-%m-%d', '%d/%m/%Y', '%d-%m-%Y', '%d.%m.%Y', '%Y/%m/%d',
+                         '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M:%S.%f')
 
 class Reserva(db.Model):
     __tablename__ = "reservas"
@@ -8,14 +26,248 @@ class Reserva(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     num_sala = db.Column(db.Integer, nullable=False)
     lab = db.Column(db.Boolean, default=False)
-    data = db.Column(db.String(20), nullable=False)
-    turma_id = db.Column(db.Integer, nullable=False)
+    data = db.Column(db.Date, nullable=False)
+    turma_id = db.Column(db.Integer, nullable=False, index=True)
+
+    __table_args__ = (
+        # Uma sala só pode ter uma reserva por dia; o índice também
+        # atende as buscas de conflito e de disponibilidade por sala
+        db.Index('uq_reservas_num_sala_data', 'num_sala', 'data', unique=True),
+    )
 
     def to_dict(self):
-        return {
-            "id": self.id,
-            "num_sala": self.num_sala,
-            "lab": self.lab,
-            "data": self.data,
-            "turma_id": self.turma_id
-        }
+        return SERIALIZADOR_RESERVA.de_objeto(self)
+
+
+SERIALIZADOR_RESERVA = Serializador(Reserva, ('id', 'num_sala', 'lab', 'data', 'turma_id'))
+
+
+def _iso_valida(valor):
+    try:
+        return date.fromisoformat(valor).isoformat() == valor
+    except (TypeError, ValueError):
+        return False
+
+
+def _converter_data_legada(valor):
+    texto = str(valor).strip()
+    for formato in FORMATOS_DATA_LEGADOS:
+        try:
+            return datetime.strptime(texto, formato).date()
+        except ValueError:
+            continue
+    return None
+
+
+class ReservasConflitantes(RuntimeError):
+    """
+    Reservas que ocupariam a mesma sala no mesmo dia e impedem o índice
+    único: o schema não é atualizado, e os grupos de ids (`conflitos`)
+    precisam ser resolvidos à mão antes de subir o serviço.
+    """
+
+    def __init__(self, conflitos):
+        self.conflitos = conflitos
+        super().__init__('Reservas na mesma sala e data (ids): ' + '; '.join(
+            ', '.join(str(id) for id in ids) for ids in conflitos))
+
+
+class ReservaQuarentena(db.Model):
+    """Reservas retiradas de `reservas` pela migração porque a data não pôde ser convertida."""
+    __tablename__ = "reservas_quarentena"
+
+    id = db.Column(db.Integer, primary_key=True)
+    num_sala = db.Column(db.Integer, nullable=False)
+    lab = db.Column(db.Boolean)
+    data = db.Column(db.String(20))
+    turma_id = db.Column(db.Integer, nullable=False)
+    movida_em = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+
+def migrar_datas():
+    """
+    Converte para ISO (AAAA-MM-DD) as datas de reservas gravadas em outros
+    formatos (ex.: '22/10/2025') enquanto a coluna era texto livre. Sem a
+    conversão, a leitura dessas linhas como Date falha com ValueError.
+
+    Só se aplica ao SQLite, onde a coluna continua sendo texto. Antes de
+    alterar qualquer linha, confere se alguma sala ficaria com duas reservas
+    no mesmo dia e, nesse caso, levanta ReservasConflitantes. As reservas
+    cuja data não pôde ser convertida vão para reservas_quarentena; retorna
+    essas (id, data), que também vão para o log.
+    """
+    if db.engine.dialect.name != 'sqlite':
+        return []
+    with db.engine.begin() as conexao:
+        # date() devolve NULL ou outra data para o que não está em ISO, mas
+        # aceita dias inexistentes como 2025-02-30: dias 29 a 31 são conferidos aqui
+        linhas = conexao.execute(db.text(
+            'SELECT id, data FROM reservas '
+            'WHERE date(data) IS NOT data OR CAST(substr(data, 9, 2) AS INTEGER) > 28')).all()
+        linhas = [(id, valor) for id, valor in linhas if not _iso_valida(valor)]
+        if not linhas:
+            return []
+
+        convertidas, invalidas = {}, []
+        for id, valor in linhas:
+            data = _converter_data_legada(valor) if valor is not None else None
+            if data is None:
+                invalidas.append((id, valor))
+            else:
+                convertidas[id] = data.isoformat()
+
+        # Ocupação de cada sala e dia com as datas já convertidas
+        quarentena = {id for id, _ in invalidas}
+        ocupacao = {}
+        for id, num_sala, valor in conexao.execute(db.text('SELECT id, num_sala, data FROM reservas')):
+            if id not in quarentena:
+                ocupacao.setdefault((num_sala, convertidas.get(id, valor)), []).append(id)
+        conflitos = sorted(sorted(ids) for ids in ocupacao.values() if len(ids) > 1)
+        if conflitos:
+            raise ReservasConflitantes(conflitos)
+
+        if invalidas:
+            ids = [{'id': id} for id, _ in invalidas]
+            conexao.execute(db.text(
+                'INSERT INTO reservas_quarentena (id, num_sala, lab, data, turma_id, movida_em) '
+                'SELECT id, num_sala, lab, data, turma_id, :agora FROM reservas WHERE id = :id'),
+                [dict(item, agora=datetime.utcnow()) for item in ids])
+            conexao.execute(db.text('DELETE FROM reservas WHERE id = :id'), ids)
+        if convertidas:
+            conexao.execute(db.text('UPDATE reservas SET data = :data WHERE id = :id'),
+                            [{'data': data, 'id': id} for id, data in convertidas.items()])
+    logger.warning('Datas de reservas convertidas para ISO: %d.', len(convertidas))
+    for id, valor in invalidas:
+        logger.warning('Reserva %s com data não reconhecida (%r) movida para reservas_quarentena.', id, valor)
+    return invalidas
+
+
+def _reservas_duplicadas():
+    """Ids das reservas agrupados por (sala, data) repetida."""
+    t = Reserva.__table__
+    chaves = (db.select(t.c.num_sala, t.c.data).group_by(t.c.num_sala, t.c.data)
+              .having(db.func.count() > 1).subquery())
+    consulta = (db.select(t.c.num_sala, t.c.data, t.c.id)
+                .join(chaves, (t.c.num_sala == chaves.c.num_sala) & (t.c.data == chaves.c.data))
+                .order_by(t.c.num_sala, t.c.data, t.c.id))
+    with db.engine.connect() as conexao:
+        grupos = groupby(conexao.execute(consulta), key=lambda linha: (linha.num_sala, linha.data))
+        return [[linha.id for linha in linhas] for _, linhas in grupos]
+
+
+def criar_indices():
+    """
+    Cria os índices declarados nos modelos que ainda não existem no banco.
+
+    O db.create_all() não altera tabelas já existentes, então bancos criados
+    antes da declaração dos índices são atualizados por esta função. Se
+    reservas duplicadas impedirem o índice único, levanta ReservasConflitantes.
+    """
+    with db.engine.begin() as conexao:
+        for nome in INDICES_REMOVIDOS:
+            conexao.execute(db.text(f'DROP INDEX IF EXISTS {nome}'))
+    for tabela in db.metadata.sorted_tables:
+        for indice in tabela.indexes:
+            try:
+                indice.create(bind=db.engine, checkfirst=True)
+            except IntegrityError as e:
+                # Sem o índice único, duas requisições simultâneas poderiam
+                # reservar a mesma sala no mesmo dia: o serviço não sobe
+                raise ReservasConflitantes(_reservas_duplicadas()) from e
+
+
+# PRAGMAs aplicados a cada conexão SQLite, por perfil (config SQLITE_PERFIL).
+# No perfil "otimizado", o WAL deixa leitores e o escritor trabalharem em
+# paralelo, synchronous=NORMAL é seguro com WAL e busy_timeout faz os
+# escritores esperarem o lock em vez de falhar com "database is locked".
+PERFIS_SQLITE = {
+    'padrao': {},
+    'otimizado': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,
+        'cache_size': -20000,
+        'mmap_size': 268435456,
+        'temp_store': 'MEMORY',
+        'foreign_keys': 'ON',
+    },
+}
+
+
+def configurar_sqlite(app):
+    """
+    Registra no engine um evento de conexão que aplica os PRAGMAs do perfil
+    SQLITE_PERFIL, sobrescritos pelos de SQLITE_PRAGMAS. Não faz nada se o
+    banco não for SQLite.
+    """
+    pragmas = dict(PERFIS_SQLITE[app.config.get('SQLITE_PERFIL', 'otimizado')])
+    pragmas.update(app.config.get('SQLITE_PRAGMAS', {}))
+    with app.app_context():
+        engine = db.engine
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def aplicar_pragmas(conexao_dbapi, registro):
+        cursor = conexao_dbapi.cursor()
+        for nome, valor in pragmas.items():
+            cursor.execute(f'PRAGMA {nome}={valor}')
+        cursor.close()
+
+
+def configurar_perfil_sql(app):
+    """
+    Registra no engine o log de consultas lentas e o perfil de SQL por
+    requisição.
+
+    Comandos acima de SQL_LENTO_MS são sempre registrados no log. Com
+    SQL_PERFIL (ou o cabeçalho X-Debug-SQL: 1, se SQL_PERFIL_HEADER), cada
+    comando da requisição é guardado com tempo e linhas afetadas, e a
+    resposta leva o cabeçalho Server-Timing com o total gasto no banco.
+    """
+    limite = app.config.get('SQL_LENTO_MS', 0) / 1000
+    perfil_sempre = app.config.get('SQL_PERFIL', False)
+    perfil_header = app.config.get('SQL_PERFIL_HEADER', False)
+    if not (limite or perfil_sempre or perfil_header):
+        return
+    with app.app_context():
+        engine = db.engine
+
+    @app.before_request
+    def iniciar_perfil_sql():
+        if perfil_sempre or (perfil_header and request.headers.get('X-Debug-SQL') == '1'):
+            g.perfil_sql = (time.perf_counter(), [])
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def iniciar_comando(conexao, cursor, sql, parametros, contexto, executemany):
+        contexto._perfil_inicio = time.perf_counter()
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def registrar_comando(conexao, cursor, sql, parametros, contexto, executemany):
+        duracao = time.perf_counter() - contexto._perfil_inicio
+        # rowcount só é conhecido para INSERT/UPDATE/DELETE (-1 em SELECT)
+        linhas = cursor.rowcount if cursor.rowcount >= 0 else None
+        if limite and duracao >= limite:
+            logger.warning('Consulta lenta (%.1f ms, linhas: %s): %s', duracao * 1000, linhas, ' '.join(sql.split()))
+        if has_request_context() and 'perfil_sql' in g:
+            g.perfil_sql[1].append((sql, duracao, linhas))
+
+    @app.after_request
+    def encerrar_perfil_sql(resposta):
+        if 'perfil_sql' not in g:
+            return resposta
+        inicio, comandos = g.pop('perfil_sql')
+        total_db = sum(duracao for _, duracao, _ in comandos)
+        resposta.headers.add('Server-Timing', f'db;dur={total_db * 1000:.2f};desc="{len(comandos)} comandos SQL"')
+        resposta.headers.add('Server-Timing', f'app;dur={(time.perf_counter() - inicio) * 1000:.2f}')
+
+        linhas_log = [f'{request.method} {request.path}: {len(comandos)} comandos SQL em {total_db * 1000:.1f} ms']
+        linhas_log += [f'  {duracao * 1000:8.2f} ms  linhas: {linhas}  {" ".join(sql.split())}'
+                       for sql, duracao, linhas in comandos]
+        # O mesmo SQL repetido muitas vezes na requisição costuma ser N+1
+        for sql, vezes in Counter(sql for sql, _, _ in comandos).most_common():
+            if vezes < 3:
+                break
+            linhas_log.append(f'  possível N+1: executado {vezes} vezes: {" ".join(sql.split())}')
+        logger.warning('\n'.join(linhas_log))
+        return resposta
@@ -0,0 +1,52 @@
+"""Mapa de disponibilidade (models/disponibilidade.py) mantido pelas rotas de escrita."""
+import pytest
+
+from models.disponibilidade import mapa
+
+DIA = '2030-03-04'
+
+
+def _reservar(cliente, num_sala, lab, data=DIA):
+    resposta = cliente.post('/reservas', json={'num_sala': num_sala, 'lab': lab, 'data': data, 'turma_id': 1})
+    assert resposta.status_code == 201, resposta.get_json()
+    return resposta.get_json()['id']
+
+
+def _salas(cliente, lab=None):
+    filtro = '' if lab is None else f'&lab={str(lab).lower()}'
+    corpo = cliente.get(f'/disponibilidade?data={DIA}{filtro}').get_json()
+    return corpo['livres'], corpo['ocupadas']
+
+
+def _consistente(app):
+    with app.app_context():
+        assert mapa.verificar() == []
+
+
+@pytest.mark.usefixtures('gerenciamento_ok')
+def test_laboratorio_deixa_de_contar_ao_liberar_suas_reservas(app, cliente):
+    lab = _reservar(cliente, 1, True)
+    _reservar(cliente, 1, False, '2030-03-05')
+    _reservar(cliente, 2, False)
+    assert _salas(cliente, lab=True) == ([], [1])
+
+    assert cliente.delete(f'/reservas/{lab}').status_code == 200
+    _consistente(app)
+    assert _salas(cliente, lab=True) == ([], [])
+    assert _salas(cliente, lab=False) == ([1], [2])
+
+
+@pytest.mark.usefixtures('gerenciamento_ok')
+def test_sala_sem_reservas_some_do_mapa(app, cliente):
+    id = _reservar(cliente, 3, False)
+    assert cliente.put(f'/reservas/{id}', json={'num_sala': 4, 'lab': True, 'data': DIA}).status_code == 200
+    _consistente(app)
+    assert _salas(cliente) == ([], [4])
+    assert _salas(cliente, lab=True) == ([], [4])
+
+
+def test_verificar_aponta_divergencia_de_laboratorio(app):
+    with app.app_context():
+        mapa._labs[7] = 1
+        assert mapa.verificar(corrigir=True) == [(7, None)]
+        assert mapa.verificar() == []
@@ -0,0 +1,80 @@
+"""
+Migração de bancos antigos (coluna data em texto livre, sem o índice único)
+feita por criar_schema() ao subir o serviço.
+"""
+import sqlite3
+
+import pytest
+
+from controller import routes
+from models.reserva_model import db, ReservasConflitantes
+
+
+def _banco_legado(tmp_path, reservas):
+    """SQLite com a tabela reservas como era antes da coluna Date e do índice único."""
+    caminho = tmp_path / 'legado.db'
+    with sqlite3.connect(caminho) as conexao:
+        conexao.execute('CREATE TABLE reservas (id INTEGER NOT NULL, num_sala INTEGER NOT NULL, lab BOOLEAN, '
+                        'data VARCHAR(20) NOT NULL, turma_id INTEGER NOT NULL, PRIMARY KEY (id))')
+        conexao.executemany('INSERT INTO reservas VALUES (?, ?, 0, ?, 1)', reservas)
+    conexao.close()
+    return caminho
+
+
+def _datas(caminho, tabela='reservas'):
+    with sqlite3.connect(caminho) as conexao:
+        datas = dict(conexao.execute(f'SELECT id, data FROM {tabela}'))
+    conexao.close()
+    return datas
+
+
+def test_datas_convertidas_e_nao_reconhecidas_em_quarentena(tmp_path, criar_app):
+    caminho = _banco_legado(tmp_path, [(1, 1, '22/10/2025'), (2, 2, '2025-10-22'),
+                                       (3, 3, 'amanhã'), (4, 1, '2025-02-30')])
+    app = criar_app(SQLALCHEMY_DATABASE_URI=f'sqlite:///{caminho}')
+
+    assert _datas(caminho) == {1: '2025-10-22', 2: '2025-10-22'}
+    assert _datas(caminho, 'reservas_quarentena') == {3: 'amanhã', 4: '2025-02-30'}
+    with app.app_context():
+        indices = db.inspect(db.engine).get_indexes('reservas')
+    assert any(i['name'] == 'uq_reservas_num_sala_data' and i['unique'] for i in indices)
+
+    cliente = app.test_client()
+    resposta = cliente.get('/reservas')
+    assert resposta.status_code == 200
+    assert sorted(r['id'] for r in resposta.get_json()) == [1, 2]
+    assert cliente.get('/reservas/3').status_code == 404
+
+
+def test_colisao_apos_conversao_recusa_a_migracao(tmp_path, criar_app):
+    legado = [(1, 1, '22/10/2025'), (2, 1, '2025-10-22'), (3, 2, '01/01/2026'), (4, 2, 'ontem')]
+    caminho = _banco_legado(tmp_path, legado)
+
+    with pytest.raises(ReservasConflitantes) as erro:
+        criar_app(SQLALCHEMY_DATABASE_URI=f'sqlite:///{caminho}')
+    assert erro.value.conflitos == [[1, 2]]
+    # Nada foi alterado
+    assert _datas(caminho) == {id: data for id, _, data in legado}
+    assert _datas(caminho, 'reservas_quarentena') == {}
+
+
+def test_duplicadas_em_iso_impedem_o_indice_unico(tmp_path, criar_app):
+    caminho = _banco_legado(tmp_path, [(1, 1, '2025-10-22'), (2, 1, '2025-10-22'), (3, 2, '2025-10-22')])
+
+    with pytest.raises(ReservasConflitantes) as erro:
+        criar_app(SQLALCHEMY_DATABASE_URI=f'sqlite:///{caminho}')
+    assert erro.value.conflitos == [[1, 2]]
+
+
+@pytest.mark.usefixtures('gerenciamento_ok')
+def test_reserva_duplicada_responde_409(cliente, monkeypatch):
+    reserva = {'num_sala': 5, 'lab': False, 'data': '2030-05-06', 'turma_id': 1}
+    assert cliente.post('/reservas', json=reserva).status_code == 201
+    assert cliente.post('/reservas', json=reserva).status_code == 409
+
+    # Sem a checagem prévia (duas requisições ao mesmo tempo), o índice único recusa
+    monkeypatch.setattr(routes, '_reserva_conflitante', lambda *args, **kwargs: None)
+    resposta = cliente.post('/reservas', json=reserva)
+    assert resposta.status_code == 409
+    assert 'mensagem' in resposta.get_json()
+    assert len(cliente.get('/reservas').get_json()) == 1